@@ -1,13 +1,30 @@
+"""
+Calc_With_OP.py – train a small dense net to compute a (op) b for + - * /.
+Run:  python Calc_With_OP.py                      # operands 0..99, whole grid in RAM
+      python Calc_With_OP.py --epochs 20               # continues the 10-epoch model
+      python Calc_With_OP.py --hi 100000 --stream --batch 4096 --steps 2000
+
+The training set is every (a, b, op) with a, b in [lo, hi).  `make_dataset`
+builds it with array arithmetic; `batches` yields it block by block for
+ranges too large to hold, and `model.fit` consumes either.
+
+Models are filed in a model_registry under a hash of the data, architecture,
+training settings and the code behind them: a matching model is reused, a
+changed one retrains, and more epochs of a cached run continue from it.
+Each entry also keeps a NumPy export, so a cached model answers through
+calc_infer without importing TensorFlow.
+"""
+import argparse, os, time
 import numpy as np
-import tensorflow as tf
+from model_registry import ModelRegistry, source_hash
 
 # Operations: multiplication (*), division (/), addition (+), subtraction (-)
 # Encoding operations numerically: * -> 0, / -> 1, + -> 2, - -> 3
 operations = {'*': 0, '/': 1, '+': 2, '-': 3}
+N_OPS = len(operations)
+WEIGHTS = "weights.npz"     # NumPy export kept beside each registry model
 
-# Adjusting the input generation to include the operation code
-x = np.array([[i, j, operations[op]] for i in range(100) for j in range(100) for op in operations.keys()])
-
+# ───────────────────────── labels ───────────────────────────────────────────
 # Adjust the calculate_result function to handle the numerical operation codes
 def calculate_result(i, j, op_code):
     if op_code == 0:  # Multiplication
@@ -19,35 +36,145 @@ def calculate_result(i, j, op_code):
     elif op_code == 3:  # Subtraction
         return i - j
 
-# Generate labels based on the operation
-y = np.array([calculate_result(i, j, op) for [i, j, op] in x])
-# Function to create the model
-def create_model():
-    model = tf.keras.models.Sequential([
-      tf.keras.layers.Dense(64, input_dim=3, activation='relu'),
-      tf.keras.layers.Dense(32, activation='relu'),
-      tf.keras.layers.Dense(1, activation='linear')
-    ])
-    model.compile(optimizer='adam', loss='mean_squared_error')
+def calculate_results(a, b, op) -> np.ndarray:
+    """calculate_result over whole arrays: each operation on its own mask,
+    division by zero gives 0."""
+    a, b = np.asarray(a, np.float64), np.asarray(b, np.float64)
+    op = np.asarray(op)
+    y = np.zeros(np.broadcast(a, b, op).shape)
+    m = op == 0
+    y[m] = a[m] * b[m]
+    m = (op == 1) & (b != 0)
+    y[m] = a[m] / b[m]
+    m = op == 2
+    y[m] = a[m] + b[m]
+    m = op == 3
+    y[m] = a[m] - b[m]
+    return y
+
+# ───────────────────────── data ─────────────────────────────────────────────
+def grid_rows(k, lo: int, hi: int) -> np.ndarray:
+    """Rows k of the (a, b, op) grid in the order the nested loops gave:
+    a slowest, op fastest.  Works on any index array, so nothing else of the
+    grid has to exist."""
+    k, n = np.asarray(k, np.int64), hi - lo
+    x = np.empty((len(k), 3), np.float32)
+    x[:, 0] = lo + k // (n * N_OPS)
+    x[:, 1] = lo + (k // N_OPS) % n
+    x[:, 2] = k % N_OPS
+    return x
+
+def grid_size(lo: int, hi: int) -> int:
+    return (hi - lo) ** 2 * N_OPS
+
+def make_dataset(lo: int = 0, hi: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """(x, y) for the whole grid, x as float32 (a, b, op code) rows."""
+    x = grid_rows(np.arange(grid_size(lo, hi)), lo, hi)
+    return x, calculate_results(x[:, 0], x[:, 1], x[:, 2]).astype(np.float32)
+
+def batches(lo: int, hi: int, batch_size: int = 4096, shuffle: bool = True,
+            seed: int = 0, start: int = 0):
+    """Endless (x, y) batches of the grid for model.fit(steps_per_epoch=…).
+
+    Shuffled batches are drawn uniformly from the whole grid; unshuffled ones
+    walk it in order and wrap.  Batch n depends only on (seed, n), so
+    `start` skips straight to batch n: a run resumed at epoch e passes
+    e * steps_per_epoch and sees what an uninterrupted run would have.
+    Only one batch exists at a time."""
+    total, n = grid_size(lo, hi), start
+    while True:
+        if shuffle:
+            k = np.random.default_rng((seed, n)).integers(0, total, batch_size)
+        else:
+            k = (n * batch_size + np.arange(batch_size)) % total
+        n += 1
+        x = grid_rows(k, lo, hi)
+        yield x, calculate_results(x[:, 0], x[:, 1], x[:, 2]).astype(np.float32)
+
+def as_tf_dataset(lo: int, hi: int, batch_size: int = 4096, seed: int = 0,
+                  start: int = 0):
+    """`batches` as a prefetching tf.data pipeline."""
+    import tensorflow as tf
+    return tf.data.Dataset.from_generator(
+        lambda: batches(lo, hi, batch_size, seed=seed, start=start),
+        output_signature=(tf.TensorSpec((None, 3), tf.float32),
+                          tf.TensorSpec((None,), tf.float32))
+    ).prefetch(tf.data.AUTOTUNE)
+
+# ───────────────────────── model ────────────────────────────────────────────
+LAYERS = ((64, "relu"), (32, "relu"))     # hidden Dense layers: (units, activation)
+
+# Function to create the model; `scaling` = (scale, offset) per input column,
+# applied by a leading Rescaling layer so the model still takes raw (a, b, op)
+def create_model(layers=LAYERS, optimizer: str = "adam", scaling=None):
+    import tensorflow as tf
+    model = tf.keras.models.Sequential(
+      [tf.keras.Input(shape=(3,))] +
+      ([tf.keras.layers.Rescaling(*scaling)] if scaling is not None else []) +
+      [tf.keras.layers.Dense(u, activation=act) for u, act in layers] +
+      [tf.keras.layers.Dense(1, activation='linear')]
+    )
+    model.compile(optimizer=optimizer, loss='mean_squared_error')
     return model
 
-# Check if the model exists and load it, otherwise create and train it
-model_path = 'my_calculator_model'
-if os.path.exists(model_path):
-    print("Loading existing model...")
-    model = load_model(model_path)
-else:
-    print("Creating and training a new model...")
-    model = create_model()
-    # Operations and data preparation code remains the same
-    # [Insert your existing code for operations, x, and y here]
-    # Train the model
-    model.fit(x, y, epochs=10)
-    # Save the model
-    model.save(model_path)
+def model_spec(lo: int = 0, hi: int = 100, epochs: int = 10, layers=LAYERS,
+               optimizer: str = "adam", stream: bool = False, batch: int = 4096,
+               steps: int | None = None, seed: int = 0) -> dict:
+    """Everything that decides the trained weights, for the model registry."""
+    data = {"lo": lo, "hi": hi, "stream": stream,
+            "code": source_hash(grid_rows, calculate_results, make_dataset, batches)}
+    if stream:
+        data.update(batch=batch, seed=seed,
+                    steps=steps or -(-grid_size(lo, hi) // batch))
+    return {"data": data,
+            "arch": {"layers": [list(l) for l in layers], "optimizer": optimizer,
+                     "code": source_hash(create_model)},
+            "train": {"epochs": epochs}}
+
+def fit(model, spec: dict, initial_epoch: int = 0):
+    """Train `model` as `spec` says, from `initial_epoch` on."""
+    d, epochs = spec["data"], spec["train"]["epochs"]
+    if d["stream"]:
+        # resume the batch stream where epoch `initial_epoch` would begin
+        ds = as_tf_dataset(d["lo"], d["hi"], d["batch"], d["seed"],
+                           start=initial_epoch * d["steps"])
+        return model.fit(ds, steps_per_epoch=d["steps"], epochs=epochs,
+                         initial_epoch=initial_epoch)
+    x, y = make_dataset(d["lo"], d["hi"])
+    return model.fit(x, y, epochs=epochs, initial_epoch=initial_epoch)
+
+def train_or_load(spec: dict, registry: ModelRegistry):
+    """(model, entry, how): the cached model for `spec`, else one trained –
+    warm-started from the same family's entry with most epochs, if any –
+    and filed in the registry.  `how` is "cached", "warm" or "trained"."""
+    from tensorflow.keras.models import load_model
+    from calc_infer import export_weights
+
+    entry = registry.get(spec)
+    if entry is not None:
+        return load_model(os.path.join(entry["dir"], registry.MODEL)), entry, "cached"
+
+    base = registry.closest(spec)
+    if base is not None:
+        model = load_model(os.path.join(base["dir"], registry.MODEL))
+        start, how = base["spec"]["train"]["epochs"], "warm"
+        print(f"Warm-starting from {start} epochs...")
+    else:
+        model, start, how = create_model(spec["arch"]["layers"],
+                                         spec["arch"]["optimizer"]), 0, "trained"
+    t0 = time.perf_counter()
+    hist = fit(model, spec, start)
+    train_s = time.perf_counter() - t0 + (base or {}).get("train_s", 0.0)
+
+    def save(d):
+        model.save(os.path.join(d, registry.MODEL))
+        export_weights(model, os.path.join(d, WEIGHTS))
+    entry = registry.put(spec, save, loss=float(hist.history["loss"][-1]),
+                         train_s=train_s, warm_from=base["key"] if base else None)
+    return model, entry, how
 
 # Prediction function
-def predict_with_operation():
+def predict_with_operation(model):
     a = float(input("Enter the first number: "))
     sign = input("Enter the operation (e.g., +, -, *, /): ")
     b = float(input("Enter the second number: "))
@@ -55,5 +182,39 @@ def predict_with_operation():
     prediction = model.predict(np.array([[a, b, op_code]]))
     print(f"The predicted result of {a} {sign} {b} is: {prediction[0][0]}")
 
-# Use the function to predict results
-predict_with_operation()ho
\ No newline at end of file
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--lo", type=int, default=0, help="smallest operand")
+    ap.add_argument("--hi", type=int, default=100, help="operands are < hi")
+    ap.add_argument("--epochs", type=int, default=10)
+    ap.add_argument("--stream", action="store_true",
+                    help="generate batches on the fly instead of the whole grid")
+    ap.add_argument("--batch", type=int, default=4096, help="rows per streamed batch")
+    ap.add_argument("--steps", type=int,
+                    help="streamed batches per epoch (default: one grid's worth)")
+    ap.add_argument("--layers", type=int, nargs="+", default=[u for u, _ in LAYERS],
+                    help="hidden layer widths (ReLU)")
+    ap.add_argument("--optimizer", default="adam")
+    ap.add_argument("--registry", default="models", help="model cache directory")
+    args = ap.parse_args()
+
+    spec = model_spec(args.lo, args.hi, args.epochs,
+                      [(u, "relu") for u in args.layers], args.optimizer,
+                      args.stream, args.batch, args.steps)
+    registry = ModelRegistry(args.registry)
+
+    # A cached model answers from its NumPy export: no TensorFlow at all
+    entry = registry.get(spec)
+    if entry is not None and os.path.exists(os.path.join(entry["dir"], WEIGHTS)):
+        from calc_infer import DenseNet
+        print(f"Using cached model {os.path.basename(entry['dir'])}...")
+        predict_with_operation(DenseNet.load(os.path.join(entry["dir"], WEIGHTS)))
+        raise SystemExit
+
+    print("Loading or training the model...")
+    model, entry, how = train_or_load(spec, registry)
+    print(f"Model {os.path.basename(entry['dir'])} ({how})")
+
+    # Use the function to predict results
+    predict_with_operation(model)
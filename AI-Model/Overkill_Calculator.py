@@ -1,33 +1,46 @@
+import os
 import numpy as np
-import tensorflow as tf
+from calc_infer import export_weights, DenseNet
 
 #Goal for today is to create a calculator with 3 inputs, a number a sign and another number
 
-# Generate synthetic data for training: pairs of numbers and their sum
+# Trained weights live next to this script; delete the file to retrain
+WEIGHTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "overkill_calculator.npz")
 
-x = np.array([[i, j] for i in range(100) for j in range(100)])
+if os.path.exists(WEIGHTS):
+    # Already trained: answer in NumPy without importing TensorFlow at all
+    net = DenseNet.load(WEIGHTS)
+else:
+    import tensorflow as tf
 
+    # Generate synthetic data for training: pairs of numbers and their sum
 
-y = np.array([i + j for [i, j] in x])
+    x = np.array([[i, j] for i in range(100) for j in range(100)])
 
-# Define a simple sequential model
-model = tf.keras.models.Sequential([
-  tf.keras.layers.Dense(4, input_dim=2, activation='relu'),
-  tf.keras.layers.Dense(2, activation='relu'),
-  tf.keras.layers.Dense(1, activation='linear')
-])
 
-# Compile the model
-model.compile(optimizer='adam', loss='mean_squared_error')
+    y = np.array([i + j for [i, j] in x])
 
-# Train the model
-model.fit(x, y, epochs=10)
+    # Define a simple sequential model
+    model = tf.keras.models.Sequential([
+      tf.keras.layers.Dense(4, input_dim=2, activation='relu'),
+      tf.keras.layers.Dense(2, activation='relu'),
+      tf.keras.layers.Dense(1, activation='linear')
+    ])
+
+    # Compile the model
+    model.compile(optimizer='adam', loss='mean_squared_error')
+
+    # Train the model
+    model.fit(x, y, epochs=10)
+
+    # Export the weights; predictions run in NumPy (calc_infer.py) from here on
+    net = DenseNet.load(export_weights(model, WEIGHTS))
 
 # Now you can use the model to predict sums
 def predict_sum():
     a = float(input("Enter the first number: "))
     b = float(input("Enter the second number: "))
-    prediction = model.predict(np.array([[a, b]]))
+    prediction = net.predict(np.array([[a, b]]))
     print(f"The predicted sum of {a} and {b} is: {prediction[0][0]}")
 
 # Use the function to predict sums
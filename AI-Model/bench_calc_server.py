@@ -0,0 +1,109 @@
+"""
+bench_calc_server.py – load-test calc_server: throughput and latency vs clients and max wait.
+Run:  python bench_calc_server.py [--model models/<key>] [--clients 1 8 32] [--max-wait-ms 0 1 5]
+      python bench_calc_server.py --url http://127.0.0.1:8765 --clients 16
+
+Without --url each setting gets its own in-process server on a free port
+(with --model, or random weights of the default 3-64-32-1 shape).  Clients
+are threads on keep-alive connections, each sending one expression at a
+time for --seconds; the table shows what they saw and the server's batching.
+"""
+import argparse, http.client, json, threading, time
+from urllib.parse import urlsplit
+import numpy as np
+from calc_server import make_server, load_net
+from calc_infer import DenseNet
+
+def random_net(sizes=(3, 64, 32, 1), seed: int = 0) -> DenseNet:
+    rng = np.random.default_rng(seed)
+    return DenseNet([(rng.standard_normal((i, o)).astype(np.float32) / np.sqrt(i),
+                      np.zeros(o, np.float32), "relu" if k < len(sizes) - 2 else "linear")
+                     for k, (i, o) in enumerate(zip(sizes, sizes[1:]))])
+
+# ───────────────────────── clients ──────────────────────────────────────────
+def load(host: str, port: int, clients: int, seconds: float) -> dict:
+    """Run `clients` closed-loop clients; return request count and latencies."""
+    lats, errors = [[] for _ in range(clients)], [0] * clients
+    start = threading.Barrier(clients + 1)
+
+    def client(k):
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        rng = np.random.default_rng(k)
+        start.wait()
+        t_end = time.perf_counter() + seconds
+        while (t := time.perf_counter()) < t_end:
+            body = json.dumps({"a": int(rng.integers(100)), "b": int(rng.integers(100)),
+                               "op": "+-*/"[int(rng.integers(4))]}).encode()
+            try:
+                conn.request("POST", "/predict", body,
+                             {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    errors[k] += 1
+                    continue
+            except OSError:
+                errors[k] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+                continue
+            lats[k].append(time.perf_counter() - t)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,), daemon=True)
+               for k in range(clients)]
+    for t in threads:
+        t.start()
+    start.wait()
+    for t in threads:
+        t.join()
+    lat = np.concatenate([np.asarray(l) for l in lats]) * 1e3
+    return {"requests": len(lat), "errors": sum(errors), "req_per_s": len(lat) / seconds,
+            "p50_ms": float(np.percentile(lat, 50)) if len(lat) else float("nan"),
+            "p99_ms": float(np.percentile(lat, 99)) if len(lat) else float("nan")}
+
+def server_stats(host: str, port: int) -> dict:
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--model", help="weights .npz or registry entry (default: random)")
+    ap.add_argument("--url", help="benchmark a running server instead")
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--max-wait-ms", type=float, nargs="+", default=[0, 1, 5])
+    ap.add_argument("--seconds", type=float, default=3.0, help="per setting")
+    args = ap.parse_args()
+
+    print(f"{'clients':>7} {'wait ms':>7} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{'rows/batch':>10} {'errors':>6}")
+    if args.url:
+        u = urlsplit(args.url)
+        settings = [(c, None) for c in args.clients]
+    else:
+        net = load_net(args.model) if args.model else random_net()
+        settings = [(c, w) for w in args.max_wait_ms for c in args.clients]
+    for clients, wait in settings:
+        if args.url:
+            host, port, server = u.hostname, u.port or 80, None
+            before = server_stats(host, port)
+        else:
+            server, batcher = make_server(net, port=0, max_wait=wait / 1e3)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = "127.0.0.1", server.server_port
+            before = server_stats(host, port)
+        r = load(host, port, clients, args.seconds)
+        after = server_stats(host, port)
+        batches = after["batches"] - before["batches"]
+        per_batch = (after["rows"] - before["rows"]) / batches if batches else 0.0
+        shown = after["max_wait_ms"] if wait is None else wait
+        print(f"{clients:7d} {shown:7g} {r['req_per_s']:8.0f} {r['p50_ms']:7.2f} "
+              f"{r['p99_ms']:7.2f} {per_batch:10.1f} {r['errors']:6d}")
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            batcher.stop()
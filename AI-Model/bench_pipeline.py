@@ -0,0 +1,136 @@
+"""
+bench_pipeline.py – capture drop rate, viewer frame time and latency vs sample rate.
+Run:  python bench_pipeline.py [--rates 256 512 1024 2048 4096] [--channels 60]
+      python bench_pipeline.py --viewer waterfall --window 60
+
+Needs no headset or display.  For each rate an eeg_simulate outlet feeds an
+Acquisition that serves, at the same time, a CaptureThread segment, a
+latency probe and the eeg_view update loop on an off-screen canvas (the
+in-process VIEWER_PROCESS=False layout, i.e. the worst case):
+  drop   samples stamped inside the segment that the recording lacks
+  e2e    sample timestamp → readable from the ring, p50 / p99
+  frame  viewer update + blit, p50 / p99, and the frame rate achieved
+"""
+import argparse, os, queue, shutil, tempfile, threading, time
+import numpy as np
+from pylsl import resolve_byprop, local_clock
+import matplotlib.pyplot as plt
+from eeg_capture import CaptureThread, CHUNK_MAX
+from eeg_acquire import Acquisition
+from eeg_simulate import Synthetic, SimulatedOutlet
+from eeg_timing import timing_report
+from eeg_view import VIEWERS
+from eeg_writer import timestamps_path
+
+def _p(values, q) -> float:
+    return float(np.percentile(values, q)) if len(values) else float("nan")
+
+# ───────────────────────── one rate ─────────────────────────────────────────
+def run_rate(rate: float, n_chan: int, chunk: int, seconds: float, out_dir: str,
+             fps: float = 25, view: bool = True, viewer: str = "lines",
+             window_s: float = 1.0) -> dict:
+    sid = f"bench-{os.getpid()}-{rate:g}"
+    sim = SimulatedOutlet(Synthetic(n_chan, rate), rate, chunk,
+                          name=f"Bench{rate:g}", source_id=sid)
+    sim.start()
+    info = resolve_byprop("source_id", sid, timeout=5)
+    if not info:
+        raise RuntimeError(f"cannot resolve simulated stream {sid}")
+    acq = Acquisition(chunk_max=CHUNK_MAX, info=info[0])
+    acq.start()
+    acq.ready.wait(10)
+
+    # latency probe: newest sample of every read vs its timestamp
+    lat, done = [], threading.Event()
+    def probe():
+        cursor = acq.subscribe()
+        while not done.is_set():
+            block, ts = cursor.read(timeout=0.05)
+            if len(block):
+                lat.append(local_clock() - ts[-1])
+    threading.Thread(target=probe, daemon=True).start()
+
+    q = queue.Queue()
+    cap = CaptureThread(os.path.join(out_dir, f"r{rate:g}"), q, source=acq,
+                        start_t=local_clock())
+    cap.start()
+
+    frames = []
+    if view:
+        fig, update = VIEWERS[viewer](window_s, fps, source=acq)
+        fig.canvas.draw()
+        t_end  = time.perf_counter() + seconds
+        period = 1.0 / fps
+        while (now := time.perf_counter()) < t_end:
+            for artist in update(None):
+                artist.axes.draw_artist(artist)
+            fig.canvas.blit(fig.bbox)
+            frames.append(time.perf_counter() - now)
+            time.sleep(max(0.0, period - frames[-1]))
+        plt.close(fig)
+    else:
+        time.sleep(seconds)
+
+    cap.stop()
+    cap.join()
+    done.set()
+    sim.stop()
+    sim.join()
+    acq.stop()
+    acq.join(timeout=1)
+
+    msgs = [q.get() for _ in range(q.qsize())]
+    errors = [p for k, p in msgs if k == "error"]
+    if errors:
+        raise RuntimeError(errors[0])
+    fpath, nsamp, _ = next(p for k, p in msgs if k == "done")
+    stats = [p for k, p in msgs if k == "stats"][-1]
+    ts  = np.load(timestamps_path(fpath))
+    # samples the outlet stamped in [start_t, end_t)
+    first = np.ceil((cap.start_t - sim.t0) * rate)
+    last  = min(np.ceil((cap.end_t - sim.t0) * rate), sim.sent)
+    expected = max(int(last - first), 1)
+    rep = timing_report(ts, rate)
+    return {"rate": rate, "expected": expected, "recorded": nsamp,
+            "drop_pct": 100 * max(expected - nsamp, 0) / expected,
+            "gap_loss_pct": rep["loss_pct"],
+            "overflows": acq.stats.overflows + stats["overflows"],
+            "late_chunks": sim.late,
+            "e2e_p50_ms": _p(lat, 50) * 1e3, "e2e_p99_ms": _p(lat, 99) * 1e3,
+            "frame_p50_ms": _p(frames, 50) * 1e3, "frame_p99_ms": _p(frames, 99) * 1e3,
+            "fps": len(frames) / seconds}
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--rates", type=float, nargs="+",
+                    default=[256, 512, 1024, 2048, 4096])
+    ap.add_argument("--channels", type=int, default=60)
+    ap.add_argument("--chunk", type=int, default=32, help="samples per outlet push")
+    ap.add_argument("--seconds", type=float, default=5.0, help="per rate")
+    ap.add_argument("--fps", type=float, default=25)
+    ap.add_argument("--no-view", action="store_true", help="skip the viewer")
+    ap.add_argument("--viewer", default="lines", choices=["lines", "waterfall"])
+    ap.add_argument("--window", type=float, default=1.0, help="viewer window, s")
+    args = ap.parse_args()
+
+    plt.switch_backend("agg")                       # off-screen, no display needed
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"{args.channels} channels, chunks of {args.chunk}, "
+              f"{args.seconds:g} s per rate\n")
+        print(f"{'rate Hz':>8} {'recorded':>9} {'drop %':>7} {'gap %':>6} "
+              f"{'ovf':>4} {'e2e p50/p99 ms':>15} {'frame p50/p99 ms':>17} {'fps':>5}")
+        for rate in args.rates:
+            r = run_rate(rate, args.channels, args.chunk, args.seconds, tmp,
+                         args.fps, not args.no_view, args.viewer, args.window)
+            print(f"{r['rate']:8g} {r['recorded']:9d} {r['drop_pct']:7.2f} "
+                  f"{r['gap_loss_pct']:6.2f} {r['overflows']:4d} "
+                  f"{r['e2e_p50_ms']:7.2f}/{r['e2e_p99_ms']:<7.2f} "
+                  f"{r['frame_p50_ms']:8.2f}/{r['frame_p99_ms']:<8.2f} "
+                  f"{r['fps']:5.1f}")
+            if r["late_chunks"]:
+                print(f"[WARN] outlet fell behind on {r['late_chunks']} chunks "
+                      f"at {rate:g} Hz; drop figures include that")
+    finally:
+        shutil.rmtree(tmp)
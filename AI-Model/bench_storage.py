@@ -0,0 +1,96 @@
+"""
+bench_storage.py – size, write throughput and load time of recording formats.
+Run:  python bench_storage.py [recordings or folders…] [--repeat 3]
+
+Without arguments it uses everything under ../data and data/.  Compares the
+original float64 np.save against streamed .npy and .eegz at float32/float16.
+"""
+import argparse, glob, os, shutil, tempfile, time
+import numpy as np
+from eeg_writer import NpyStreamWriter
+from eeg_compress import EegzWriter, EegzReader, is_recording
+
+BLOCK = 1024
+
+# ───────────────────────── formats ──────────────────────────────────────────
+def _save_legacy(path, data):
+    np.save(path, np.asarray(data.tolist()))        # what CaptureThread used to do
+
+def _stream(writer_cls, **kw):
+    def save(path, data):
+        with writer_cls(path, data.shape[1], block_rows=BLOCK, **kw) as w:
+            for i in range(0, len(data), 32):       # ~pull_chunk sized appends
+                w.append(data[i:i + 32])
+    return save
+
+def _load_eegz(path):
+    with EegzReader(path) as r:
+        return r.read()
+
+def _chunk_eegz(path):
+    with EegzReader(path) as r:
+        return r.read_chunk(r.n_chunks // 2)
+
+FORMATS = [  # name, ext, save, load, single-chunk load
+    ("legacy f64 np.save", ".npy",  _save_legacy, np.load, None),
+    ("npy f32",        ".npy",  _stream(NpyStreamWriter, dtype=np.float32), np.load,
+     lambda p: np.load(p, mmap_mode="r")[:BLOCK].copy()),
+    ("npy f16",        ".npy",  _stream(NpyStreamWriter, dtype=np.float16), np.load,
+     lambda p: np.load(p, mmap_mode="r")[:BLOCK].copy()),
+    ("eegz f32 zlib",  ".eegz", _stream(EegzWriter, dtype=np.float32, codec="zlib"),
+     _load_eegz, _chunk_eegz),
+    ("eegz f16 zlib",  ".eegz", _stream(EegzWriter, dtype=np.float16, codec="zlib"),
+     _load_eegz, _chunk_eegz),
+    ("eegz f32 lzma",  ".eegz", _stream(EegzWriter, dtype=np.float32, codec="lzma"),
+     _load_eegz, _chunk_eegz),
+    ("eegz f16 lzma",  ".eegz", _stream(EegzWriter, dtype=np.float16, codec="lzma"),
+     _load_eegz, _chunk_eegz),
+    ("eegz f16 zlib Δ", ".eegz", _stream(EegzWriter, dtype=np.float16, codec="zlib",
+                                          delta=True), _load_eegz, _chunk_eegz),
+]
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("paths", nargs="*", default=["../data", "data"])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    files = []
+    for p in args.paths:
+        found = glob.glob(os.path.join(p, "**", "*"), recursive=True) \
+                if os.path.isdir(p) else [p]
+        files += [f for f in found if f.endswith(".npy") and is_recording(f)]
+    arrays = [a for a in map(np.load, files) if a.ndim == 2 and a.shape[1] == 60]
+    if not arrays:
+        raise SystemExit("no recordings found")
+    data = np.concatenate(arrays).astype(np.float64)
+    print(f"{len(arrays)} files, {data.shape[0]} samples × {data.shape[1]} bins "
+          f"(write MB/s is of float64 input)\n")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"{'format':18} {'size KB':>9} {'ratio':>6} {'write MB/s':>11} "
+              f"{'load ms':>8} {'chunk ms':>9}  max |err|")
+        base = None
+        for name, ext, save, load, chunk in FORMATS:
+            path = os.path.join(tmp, "rec" + ext)
+            t_w  = _best(lambda: save(path, data), args.repeat)
+            size = os.path.getsize(path)
+            base = base or size
+            t_l  = _best(lambda: load(path), args.repeat)
+            t_c  = _best(lambda: chunk(path), args.repeat) if chunk else float("nan")
+            err  = float(np.max(np.abs(load(path).astype(np.float64) - data)))
+            print(f"{name:18} {size / 1024:9.1f} {base / size:6.1f} "
+                  f"{data.nbytes / 2**20 / t_w:11.1f} {t_l * 1e3:8.2f} "
+                  f"{t_c * 1e3:9.3f}  {err:.3g}")
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,118 @@
+"""
+calc_infer.py – run the calculator nets in NumPy from weights exported to .npz.
+Run:  python calc_infer.py export my_calculator_model my_calculator_model.npz
+      python calc_infer.py my_calculator_model.npz 12 / 4     # one expression
+      python calc_infer.py my_calculator_model.npz             # prompt, like the scripts
+
+`export_weights` dumps the Dense layers of a trained Keras Sequential model
+(kernel, bias, activation) into one small .npz, folding a leading Rescaling
+into the first kernel; only the export itself needs TensorFlow.  `DenseNet`
+replays the forward pass as float32 matrix products, so it matches
+model.predict to float32 rounding and needs nothing but NumPy.
+"""
+import argparse, sys, time
+import numpy as np
+
+ACTIVATIONS = {
+    "linear":  lambda x: x,
+    "relu":    lambda x: np.maximum(x, 0, out=x),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "tanh":    np.tanh,
+}
+PASSTHROUGH = ("InputLayer", "Dropout")     # no-ops at inference time
+
+# ───────────────────────── export ───────────────────────────────────────────
+def export_weights(model, path: str) -> str:
+    """Write a Sequential model's Dense stack to `path` (.npz)."""
+    arrays, rescale = {}, None
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in PASSTHROUGH:
+            continue
+        if kind == "Rescaling" and rescale is None:  # folded into the next Dense
+            # the attributes, not get_config(): Keras 3 serialises array values
+            rescale = (np.asarray(layer.scale, np.float32),
+                       np.asarray(layer.offset, np.float32))
+            continue
+        if kind != "Dense":
+            raise ValueError(f"cannot export layer {layer.name!r} ({kind})")
+        cfg = layer.get_config()
+        act = cfg["activation"] if isinstance(cfg["activation"], str) \
+              else cfg["activation"].get("config", {}).get("name", "")
+        if act not in ACTIVATIONS:
+            raise ValueError(f"unsupported activation {act!r} in {layer.name!r}")
+        weights = layer.get_weights()
+        i = len(arrays) // 3
+        kernel = np.asarray(weights[0], np.float32)
+        arrays[f"W{i}"]   = kernel
+        arrays[f"b{i}"]   = (np.asarray(weights[1], np.float32) if len(weights) > 1
+                             else np.zeros(kernel.shape[1], np.float32))
+        if rescale is not None:                     # (x*s + o) @ W = x @ (s*W) + o @ W
+            scale, offset = (np.broadcast_to(v, kernel.shape[:1]) for v in rescale)
+            arrays[f"b{i}"] = arrays[f"b{i}"] + offset @ kernel
+            arrays[f"W{i}"] = kernel = scale[:, None] * kernel
+            rescale = None
+        arrays[f"act{i}"] = np.array(act)
+    if not arrays or rescale is not None:
+        raise ValueError("model has no Dense layers" if not arrays
+                         else "Rescaling is not followed by a Dense layer")
+    np.savez(path, **arrays)
+    return path
+
+def export_saved_model(model_path: str, out: str) -> str:
+    """Load a saved Keras model (imports TensorFlow) and export it."""
+    from tensorflow.keras.models import load_model
+    return export_weights(load_model(model_path, compile=False), out)
+
+# ───────────────────────── inference ────────────────────────────────────────
+class DenseNet:
+    """Forward pass of an exported Dense stack; predict() takes (n, inputs)."""
+
+    def __init__(self, layers: list[tuple[np.ndarray, np.ndarray, str]]):
+        self.layers = [(W, b, ACTIVATIONS[act]) for W, b, act in layers]
+        self.n_in = layers[0][0].shape[0]
+
+    @classmethod
+    def load(cls, path: str) -> "DenseNet":
+        with np.load(path) as z:
+            n = sum(1 for k in z.files if k.startswith("W"))
+            return cls([(z[f"W{i}"], z[f"b{i}"], str(z[f"act{i}"])) for i in range(n)])
+
+    def predict(self, x) -> np.ndarray:
+        """(n, outputs) for a batch, like model.predict."""
+        x = np.asarray(x, np.float32).reshape(-1, self.n_in)
+        for W, b, act in self.layers:
+            x = act(x @ W + b)
+        return x
+
+    def __call__(self, x) -> np.ndarray:
+        return self.predict(x)
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        ap = argparse.ArgumentParser(description="export a saved Keras model to .npz")
+        ap.add_argument("cmd")
+        ap.add_argument("model", help="saved Keras model")
+        ap.add_argument("out", help="weights file to write (.npz)")
+        args = ap.parse_args()
+        print(f"[DONE] {export_saved_model(args.model, args.out)}")
+        sys.exit()
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("weights", help=".npz written by export")
+    ap.add_argument("expr", nargs="*", help="a op b, e.g. 12 / 4")
+    args = ap.parse_args()
+
+    from Calc_With_OP import operations            # NumPy only, no TensorFlow
+    net = DenseNet.load(args.weights)
+    if args.expr:
+        a, sign, b = args.expr
+        pred = net.predict([[float(a), float(b), operations[sign]]])
+        print(f"The predicted result of {a} {sign} {b} is: {pred[0][0]}")
+        print(f"[INFO] cold start {(time.perf_counter() - t0) * 1e3:.1f} ms "
+              f"(after the interpreter and NumPy)")
+    else:
+        from Calc_With_OP import predict_with_operation
+        predict_with_operation(net)
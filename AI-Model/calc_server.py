@@ -0,0 +1,204 @@
+"""
+calc_server.py – serve a calculator model over localhost HTTP with micro-batching.
+Run:  python calc_server.py models/4c9abccd51a678e1 [--port 8765] [--max-wait-ms 2]
+      curl -s localhost:8765/predict -d '{"a": 12, "op": "/", "b": 4}'
+      curl -s localhost:8765/stats
+
+The model (a calc_infer .npz, or a registry entry holding one) is loaded
+once.  Every HTTP request only queues its rows; one batcher thread takes
+whatever has queued, waits at most `max_wait` for more (up to `max_batch`
+rows), runs a single forward pass and hands each caller its slice.  It
+stops waiting as soon as every caller in flight is in the batch, so a lone
+client never pays the wait.
+  POST /predict  {"a": 12, "op": "/", "b": 4}      → {"y": 3.0…}
+                 {"rows": [[a, b, op_code], …]}    → {"y": […]}
+  GET  /stats    counters, batch sizes, latency p50/p99, rows/s
+"""
+import argparse, collections, json, os, queue, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from calc_infer import DenseNet
+from Calc_With_OP import operations, WEIGHTS
+
+MAX_BATCH    = 1024     # rows per forward pass
+MAX_WAIT     = 0.002    # s the first queued request waits for company
+LATENCY_KEEP = 4096     # recent requests kept for the percentiles
+
+def load_net(path: str) -> DenseNet:
+    """DenseNet from a .npz or from a model registry entry directory."""
+    return DenseNet.load(os.path.join(path, WEIGHTS) if os.path.isdir(path) else path)
+
+# ───────────────────────── micro-batcher ────────────────────────────────────
+class _Request:
+    __slots__ = ("rows", "t", "done", "out", "error")
+
+    def __init__(self, rows: np.ndarray):
+        self.rows, self.t = rows, time.perf_counter()
+        self.done = threading.Event()
+        self.out = self.error = None
+
+class MicroBatcher(threading.Thread):
+    """Coalesce concurrent predict() calls into batched forward passes."""
+
+    def __init__(self, predict, n_in: int, max_batch: int = MAX_BATCH,
+                 max_wait: float = MAX_WAIT):
+        super().__init__(daemon=True)
+        self.predict_batch, self.max_batch, self.max_wait = predict, max_batch, max_wait
+        self.n_in = n_in                            # columns every row must have
+        self.q = queue.SimpleQueue()
+        self.stopflag = threading.Event()
+        self.requests = self.rows = self.batches = self.errors = 0
+        self.inflight = 0                           # callers inside predict()
+        self._lock = threading.Lock()
+        self.latency = collections.deque(maxlen=LATENCY_KEEP)
+        self.t0 = time.perf_counter()
+
+    def predict(self, rows, timeout: float | None = 10.0) -> np.ndarray:
+        """Queue `rows` (n, inputs) and wait for their outputs; any thread."""
+        rows = np.asarray(rows, np.float32)
+        if rows.ndim != 2 or rows.shape[1] != self.n_in:    # reject before it can sink a batch
+            raise ValueError(f"rows must be (n, {self.n_in}), got {rows.shape}")
+        req = _Request(rows)
+        with self._lock:
+            self.inflight += 1
+        self.q.put(req)
+        try:
+            if not req.done.wait(timeout):
+                raise TimeoutError("no answer from the batcher")
+        finally:
+            with self._lock:
+                self.inflight -= 1
+        if req.error is not None:
+            raise req.error
+        return req.out
+
+    def run(self):
+        while not self.stopflag.is_set():
+            try:
+                first = self.q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch, n = [first], len(first.rows)
+            deadline = first.t + self.max_wait
+            while n < self.max_batch:
+                try:                                # take what is already queued
+                    req = self.q.get_nowait()
+                except queue.Empty:
+                    wait = deadline - time.perf_counter()
+                    if wait <= 0 or len(batch) >= self.inflight:
+                        break                       # nobody else is coming
+                    try:
+                        req = self.q.get(timeout=wait)
+                    except queue.Empty:
+                        break
+                batch.append(req)
+                n += len(req.rows)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_Request]):
+        try:
+            out = self.predict_batch(np.concatenate([r.rows for r in batch]))
+        except Exception as e:
+            self.errors += len(batch)
+            for r in batch:
+                r.error = e
+                r.done.set()
+            return
+        done, i = time.perf_counter(), 0
+        for r in batch:
+            r.out = out[i:i + len(r.rows)]
+            i += len(r.rows)
+            self.latency.append(done - r.t)
+            r.done.set()
+        self.requests += len(batch)
+        self.rows += i
+        self.batches += 1
+
+    def stats(self) -> dict:
+        lat = np.asarray(self.latency) * 1e3
+        p50, p99 = np.percentile(lat, (50, 99)) if len(lat) else (float("nan"),) * 2
+        dt = time.perf_counter() - self.t0
+        return {"requests": self.requests, "rows": self.rows, "batches": self.batches,
+                "errors": self.errors, "queued": self.q.qsize(),
+                "mean_batch_rows": self.rows / self.batches if self.batches else 0.0,
+                "latency_p50_ms": float(p50), "latency_p99_ms": float(p99),
+                "rows_per_s": self.rows / dt if dt > 0 else 0.0,
+                "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1e3}
+
+    def stop(self):
+        self.stopflag.set()
+
+# ───────────────────────── HTTP front end ───────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"                   # keep-alive for busy clients
+    disable_nagle_algorithm = True                  # small replies go out at once
+    batcher: MicroBatcher                           # set by make_server
+
+    def _reply(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, self.batcher.stats())
+        else:
+            self._reply(404, {"error": "GET /stats or POST /predict"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            return self._reply(404, {"error": "POST /predict"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if "rows" in body:
+                y = self.batcher.predict(body["rows"])[:, 0]
+                return self._reply(200, {"y": y.tolist()})
+            op = body["op"]
+            y = self.batcher.predict([[body["a"], body["b"],
+                                       operations[op] if isinstance(op, str) else op]])
+            self._reply(200, {"y": float(y[0, 0])})
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {"error": f"bad request: {e!r}"})
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+
+    def log_message(self, *args):                   # one line per request is too many
+        pass
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128                        # many clients connect at once
+
+def make_server(net, host: str = "127.0.0.1", port: int = 8765,
+                max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+    """(server, batcher), both ready; call server.serve_forever()."""
+    batcher = MicroBatcher(net.predict, net.n_in, max_batch, max_wait)
+    batcher.start()
+    handler = type("BoundHandler", (Handler,), {"batcher": batcher})
+    server = _Server((host, port), handler)
+    return server, batcher
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("model", help="weights .npz or model registry entry")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1e3)
+    args = ap.parse_args()
+
+    server, batcher = make_server(load_net(args.model), args.host, args.port,
+                                  args.max_batch, args.max_wait_ms / 1e3)
+    print(f"[INFO] Serving {args.model} on http://{args.host}:{server.server_port} "
+          f"– Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    batcher.stop()
+    print(f"[DONE] {batcher.stats()}", file=sys.stderr)
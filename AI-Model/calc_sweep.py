@@ -0,0 +1,169 @@
+"""
+calc_sweep.py – train many calculator nets in parallel and rank loss against training time.
+Run:  python calc_sweep.py [--widths 16 64] [--depths 1 2 3] [--optimizers adam sgd]
+                           [--scalings none minmax standard] [--epochs 10] [--workers 4]
+
+The (a, b, op) grid is generated once and written to <out>/x.npy and
+<out>/y.npy; every worker memory-maps the same two files, so N workers cost
+one dataset.  Configurations run in a spawn process pool whose workers get
+`--threads` BLAS/TensorFlow threads each (default cores ÷ workers), so the
+pool never runs more threads than there are cores.  Results go to
+<out>/leaderboard.csv, best loss first, with the loss/time Pareto front
+marked.
+"""
+import argparse, csv, itertools, os, sys, time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+               "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+FIELDS = ("rank", "name", "width", "depth", "optimizer", "scaling", "epochs",
+          "loss", "train_s", "params", "pareto", "error")
+
+# ───────────────────────── configurations ───────────────────────────────────
+def config_grid(widths, depths, optimizers, scalings, epochs: int,
+                batch: int) -> list[dict]:
+    return [{"name": f"{w}x{d}-{o}-{s}", "width": w, "depth": d, "optimizer": o,
+             "scaling": s, "epochs": epochs, "batch": batch}
+            for w, d, o, s in itertools.product(widths, depths, optimizers, scalings)]
+
+def scaling_params(x: np.ndarray, kind: str):
+    """(scale, offset) per input column for create_model, or None."""
+    if kind == "none":
+        return None
+    if kind == "minmax":                            # each column onto [0, 1]
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        return (1 / span).tolist(), (-lo / span).tolist()
+    if kind == "standard":                          # zero mean, unit variance
+        mu, sd = x.mean(axis=0), x.std(axis=0)
+        sd = np.where(sd > 0, sd, 1.0)
+        return (1 / sd).tolist(), (-mu / sd).tolist()
+    raise ValueError(f"unknown scaling {kind!r}")
+
+def write_dataset(out: str, lo: int, hi: int) -> tuple[str, str]:
+    """Generate the grid once; workers memory-map the files."""
+    from Calc_With_OP import make_dataset
+    x, y = make_dataset(lo, hi)
+    paths = os.path.join(out, "x.npy"), os.path.join(out, "y.npy")
+    np.save(paths[0], x)
+    np.save(paths[1], y)
+    return paths
+
+# ───────────────────────── worker side ──────────────────────────────────────
+def init_worker(threads: int):
+    """Pool initializer: cap this process's compute threads."""
+    for var in THREAD_VARS[:3]:
+        os.environ[var] = str(threads)
+    try:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except ImportError:
+        pass
+
+def train_trial(cfg: dict, x_path: str, y_path: str, scaling) -> dict:
+    """Train one configuration on the memory-mapped grid."""
+    from Calc_With_OP import create_model
+    x = np.load(x_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    model = create_model([(cfg["width"], "relu")] * cfg["depth"], cfg["optimizer"],
+                         scaling)
+    t0 = time.perf_counter()
+    hist = model.fit(x, y, epochs=cfg["epochs"], batch_size=cfg["batch"], verbose=0)
+    return {"loss": float(hist.history["loss"][-1]),
+            "train_s": time.perf_counter() - t0, "params": model.count_params()}
+
+def _run(trial, cfg, x_path, y_path, scaling) -> dict:
+    try:
+        return {**cfg, **trial(cfg, x_path, y_path, scaling)}
+    except Exception as e:                          # one bad config keeps the rest
+        return {**cfg, "loss": float("inf"), "train_s": float("nan"),
+                "params": 0, "error": f"{type(e).__name__}: {e}"}
+
+# ───────────────────────── sweep ────────────────────────────────────────────
+def pareto(rows: list[dict]) -> None:
+    """Mark rows no other row beats on both loss and training time."""
+    best_t = float("inf")
+    for r in sorted(rows, key=lambda r: (r["loss"], r["train_s"])):
+        r["pareto"] = "*" if r["train_s"] < best_t and np.isfinite(r["loss"]) else ""
+        if r["pareto"]:
+            best_t = r["train_s"]
+
+def run_sweep(configs: list[dict], x_path: str, y_path: str, workers: int,
+              threads: int, trial=train_trial) -> list[dict]:
+    """Train every config in a spawn pool; return rows ranked by loss."""
+    x = np.load(x_path, mmap_mode="r")
+    scalings = {s: scaling_params(np.asarray(x), s) for s in {c["scaling"] for c in configs}}
+    saved = {v: os.environ.get(v) for v in THREAD_VARS}
+    os.environ.update({v: str(threads) for v in THREAD_VARS[:4]})
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"      # children inherit these at spawn
+    rows = []
+    try:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"),
+                                 initializer=init_worker, initargs=(threads,)) as pool:
+            futs = [pool.submit(_run, trial, c, x_path, y_path, scalings[c["scaling"]])
+                    for c in configs]
+            for i, fut in enumerate(as_completed(futs), 1):
+                r = fut.result()
+                rows.append(r)
+                msg = r.get("error") or f"loss {r['loss']:.4g} in {r['train_s']:.1f} s"
+                print(f"[{i}/{len(configs)}] {r['name']}: {msg}")
+    finally:
+        for v, old in saved.items():
+            if old is None:
+                os.environ.pop(v, None)
+            else:
+                os.environ[v] = old
+    rows.sort(key=lambda r: r["loss"])
+    for rank, r in enumerate(rows, 1):
+        r["rank"] = rank
+    pareto(rows)
+    return rows
+
+def write_leaderboard(rows: list[dict], path: str):
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, FIELDS, restval="", extrasaction="ignore")
+        w.writeheader()
+        w.writerows({**r, "loss": f"{r['loss']:.6g}", "train_s": f"{r['train_s']:.3f}"}
+                    for r in rows)
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--lo", type=int, default=0)
+    ap.add_argument("--hi", type=int, default=100)
+    ap.add_argument("--widths", type=int, nargs="+", default=[16, 32, 64])
+    ap.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3])
+    ap.add_argument("--optimizers", nargs="+", default=["adam", "rmsprop", "sgd"])
+    ap.add_argument("--scalings", nargs="+", default=["none", "minmax"],
+                    choices=["none", "minmax", "standard"])
+    ap.add_argument("--epochs", type=int, default=10)
+    ap.add_argument("--batch", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--threads", type=int, help="per worker (default: cores ÷ workers)")
+    ap.add_argument("--out", default="sweep", help="dataset + leaderboard folder")
+    args = ap.parse_args()
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    os.makedirs(args.out, exist_ok=True)
+    x_path, y_path = write_dataset(args.out, args.lo, args.hi)
+    configs = config_grid(args.widths, args.depths, args.optimizers, args.scalings,
+                          args.epochs, args.batch)
+    print(f"[INFO] {len(configs)} configs, {args.workers} workers × {threads} threads, "
+          f"dataset {os.path.getsize(x_path) + os.path.getsize(y_path)} bytes shared")
+    t0 = time.perf_counter()
+    rows = run_sweep(configs, x_path, y_path, args.workers, threads)
+    board = os.path.join(args.out, "leaderboard.csv")
+    write_leaderboard(rows, board)
+
+    print(f"\n{'rank':>4} {'config':<24} {'loss':>12} {'train s':>8} {'params':>7}")
+    for r in rows[:20]:
+        print(f"{r['rank']:4d} {r['name']:<24} {r['loss']:12.4g} {r['train_s']:8.1f} "
+              f"{r['params']:7d} {r['pareto']}")
+    failed = sum(1 for r in rows if r.get("error"))
+    if failed:
+        print(f"[WARN] {failed} configs failed, see {board}", file=sys.stderr)
+    print(f"[DONE] {len(rows)} configs in {time.perf_counter() - t0:.1f} s → {board} "
+          f"(* = Pareto front of loss vs time)")
@@ -1,51 +1,35 @@
 # capture_gui_and_backend.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading, queue, time, os, sys, numpy as np
-from pylsl import StreamInlet, resolve_byprop
-from eeg_view import start_live_viewer
+import threading, queue, os, sys, numpy as np
+import multiprocessing as mp
+from pylsl import local_clock
+from eeg_view import start_live_viewer, run_viewer_process
+from eeg_capture import CaptureThread     # the backend; constants live there too
+from eeg_writer import timestamps_path
+from eeg_catalog import Catalog
+from eeg_timing import timing_report, format_report
+from eeg_acquire import Acquisition
+from eeg_live_classify import LiveClassifier
+from eeg_markers import MarkerListener, END
+from eeg_telemetry import TelemetryLog, format_telemetry
 
-FFT_MAX_HZ = 60  # keep first 60 bins per sample
+VIEWER_PROCESS = True  # render the live viewer in its own process
+VIEWER_MODE = "lines"   # or "waterfall": bins × time image, suits FFT rows
+LIVE_MODEL  = None  # path of a trained Keras model to classify the live stream
+MARKER_STREAM = None    # name of an LSL marker stream to record, "" = any
+MARKER_LABELS = ()      # quick marker buttons, e.g. ("rest", "happy", "walking")
+TELEMETRY_STDOUT = False    # print capture telemetry every STATS_EVERY
+TELEMETRY_CSV    = None     # append it to this CSV file, e.g. "telemetry.csv"
 
-# ───────────────────────────────── capture thread ───────────────────────────
-class CaptureThread(threading.Thread):
-    def __init__(self, save_dir: str, q: queue.Queue):
-        super().__init__(daemon=True)
-        self.save_dir, self.q = save_dir, q
-        self.stopflag = threading.Event()
-
-    def run(self):
-        try:
-            streams = resolve_byprop("type", "EEG", timeout=5)
-            inlet   = StreamInlet(streams[0])
-        except Exception as e:
-            self.q.put(("error", f"LSL error: {e}"))
-            return
-
-        data = []
-        self.q.put(("status", "Recording…"))
-        while not self.stopflag.is_set():
-            sample, _ = inlet.pull_sample(timeout=0.1)
-            if sample:
-                fixed = sample[:FFT_MAX_HZ] if len(sample) >= FFT_MAX_HZ \
-                        else sample + [0]*(FFT_MAX_HZ - len(sample))
-                data.append(fixed)
-
-        # save
-        os.makedirs(self.save_dir, exist_ok=True)
-        fname  = time.strftime("%Y%m%d_%H%M%S") + ".npy"
-        fpath  = os.path.join(self.save_dir, fname)
-        np.save(fpath, np.asarray(data))
-
-        # send file path & sample count back to GUI
-        self.q.put(("done", (fpath, len(data))))
-
-    def stop(self):
-        self.stopflag.set()
+# ───────────────────────────────── helpers ──────────────────────────────────
+def segment_status(label: str) -> str:
+    return f"Recording… segment: {label}" if label != END else "Recording… (unlabelled)"
 
 # ───────────────────────────────── GUI ──────────────────────────────────────
 class CaptureGUI(tk.Tk):
-    def __init__(self):
+    def __init__(self, viewer_process: bool = VIEWER_PROCESS,
+                 live_model: str | None = LIVE_MODEL):
         super().__init__()
         self.title("EEG Capture – Data Dave")
         self.resizable(False, False)
@@ -71,13 +55,96 @@ class CaptureGUI(tk.Tk):
         ttk.Label(self, textvariable=self.status) \
             .grid(row=3, column=0, columnspan=2, pady=(0,8))
 
+        # live prediction label (only with a model)
+        self.pred_var = tk.StringVar(value="")
+        if live_model:
+            ttk.Label(self, textvariable=self.pred_var, foreground="blue") \
+                .grid(row=4, column=0, columnspan=2, pady=(0,8))
+
+        # markers: label the running recording without stopping it
+        marks = ttk.Frame(self, padding=(5,0,5,8))
+        marks.grid(row=5, column=0, columnspan=2, sticky="w")
+        self.mark_var = tk.StringVar()
+        ttk.Entry(marks, width=16, textvariable=self.mark_var).pack(side="left")
+        ttk.Button(marks, text="Mark",
+                   command=lambda: self.mark(self.mark_var.get().strip() or None)) \
+            .pack(side="left", padx=(4,0))
+        ttk.Button(marks, text="End", command=lambda: self.mark(END)) \
+            .pack(side="left", padx=(4,0))
+        for label in MARKER_LABELS:
+            ttk.Button(marks, text=label, command=lambda l=label: self.mark(l)) \
+                .pack(side="left", padx=(4,0))
+
+        # telemetry of the running recording
+        self.telemetry_var = tk.StringVar(value="")
+        ttk.Label(self, textvariable=self.telemetry_var, foreground="grey") \
+            .grid(row=6, column=0, columnspan=2, sticky="w", padx=5, pady=(0,8))
+        self.telemetry_log = TelemetryLog(TELEMETRY_CSV) if TELEMETRY_CSV else None
+
         # internal
         self.worker: CaptureThread | None = None
         self.msg_q = queue.Queue()
+        self.last_stats: dict | None = None
+        self.connected = False
         self.after(100, self.poll_q)
 
-        # start live viewer in separate thread
-        threading.Thread(target=start_live_viewer, daemon=True).start()
+        # one shared inlet feeds both the live viewer and every recording
+        self.acq = Acquisition(shared=viewer_process)
+        self.acq.start()
+        self.viewer: mp.process.BaseProcess | None = None
+        if viewer_process:
+            threading.Thread(target=self.launch_viewer, daemon=True).start()
+        else:
+            threading.Thread(target=start_live_viewer,
+                             kwargs={"source": self.acq, "mode": VIEWER_MODE},
+                             daemon=True).start()
+        self.clf: LiveClassifier | None = None
+        if live_model:
+            classes = None                          # same order as EEGDataset
+            if os.path.isdir("data"):
+                with Catalog("data") as cat:
+                    cat.update()
+                    classes = sorted(cat.categories())
+            self.clf = LiveClassifier(self.acq, live_model, classes,
+                                      out_q=queue.Queue(maxsize=1))
+            self.clf.start()
+        self.markers: MarkerListener | None = None
+        if MARKER_STREAM is not None:
+            self.markers = MarkerListener(self.on_marker, MARKER_STREAM or None)
+            self.markers.start()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    # ── viewer process / shutdown ───────────────────────────────────────────
+    def launch_viewer(self):
+        spec = self.acq.shared_spec()               # waits for the stream
+        # spawn, not fork: forking a process running Tk and liblsl threads,
+        # from a thread, can leave the child's TkAgg hung on copied locks
+        ctx = mp.get_context("spawn")
+        self.viewer = ctx.Process(target=run_viewer_process, args=(spec,),
+                                  kwargs={"mode": VIEWER_MODE}, daemon=True)
+        self.viewer.start()
+
+    def on_close(self):
+        # every reader of the ring stops before the acquisition closes it; the
+        # worker is joined in full so the recording is finished and indexed
+        if self.worker is not None:
+            self.worker.stop()
+        if self.clf is not None:
+            self.clf.stop()
+        if self.worker is not None:
+            self.worker.join()
+        if self.clf is not None:
+            self.clf.join()
+        if self.viewer is not None:
+            self.viewer.terminate()
+            self.viewer.join(timeout=1)
+        if self.markers is not None:
+            self.markers.stop()
+        if self.telemetry_log is not None:
+            self.telemetry_log.close()
+        self.acq.stop()
+        self.acq.join(timeout=1)
+        self.destroy()
 
     # ── start/stop recording ────────────────────────────────────────────────
     def toggle(self):
@@ -87,45 +154,104 @@ class CaptureGUI(tk.Tk):
                 messagebox.showerror("Folder error",
                                      "Enter something like data/walking")
                 return
-            self.worker = CaptureThread(folder, self.msg_q)
+            self.worker = CaptureThread(folder, self.msg_q, source=self.acq,
+                                        start_t=local_clock())
             self.worker.start()
             self.rec_btn.config(text="■  Stop")
-            self.status.set("Connecting to LSL…")
+            self.status.set("Opening segment…" if self.connected
+                            else "Waiting for EEG stream…")
         else:                                       # stop
             self.worker.stop()
             self.rec_btn.config(state="disabled")
 
+    # ── markers ─────────────────────────────────────────────────────────────
+    def mark(self, label: str | None):
+        if label is None:
+            return
+        if self.worker is None:
+            self.status.set("Markers apply to a running recording")
+            return
+        self.worker.mark(label)
+        self.status.set(segment_status(label))
+
+    def on_marker(self, label: str, t: float):
+        """MarkerListener callback, on its own thread."""
+        worker = self.worker
+        if worker is not None:
+            worker.mark(label, t)
+            self.msg_q.put(("status", segment_status(label)))
+
     # ── queue poll ──────────────────────────────────────────────────────────
     def poll_q(self):
-        try:
-            kind, payload = self.msg_q.get_nowait()
-            if kind == "status":
-                self.status.set(payload)
-
-            elif kind == "done":
-                fpath, nsamp = payload
-                self.status.set(f"Saved {nsamp} samples to {os.path.basename(fpath)}")
-                # print summary to terminal
-                print(f"[DONE] {nsamp} samples saved → {fpath}")
-                try:
-                    data = np.load(fpath)
-                    print(f"       array shape: {data.shape}, dtype: {data.dtype}")
-                except Exception as e:
-                    print(f"[WARN] Could not load file to inspect: {e}")
-
-                self.rec_btn.config(text="●  Record", state="normal")
-                self.worker = None
-
-            elif kind == "error":
-                self.status.set(payload)
-                messagebox.showerror("Runtime error", payload)
-                self.rec_btn.config(text="●  Record", state="normal")
-                self.worker = None
-
-        except queue.Empty:
-            pass
+        if not self.connected and self.acq.ready.is_set():
+            self.connected = True
+            if self.worker is None:
+                self.status.set(f"Connected to {self.acq.info.name()} – ready")
+        if self.clf is not None:
+            try:
+                _, p = self.clf.out_q.get_nowait()
+                self.pred_var.set(f"Live: {p['label']} ({p['prob']:.0%}, "
+                                  f"{p['latency_ms']:.0f} ms)")
+            except queue.Empty:
+                if self.clf.error:
+                    self.pred_var.set(self.clf.error)
+        while True:                                 # everything posted since last tick
+            try:
+                kind, payload = self.msg_q.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_msg(kind, payload)
         self.after(100, self.poll_q)
 
+    def handle_msg(self, kind: str, payload):
+        if kind == "status":
+            self.status.set(payload)
+
+        elif kind == "stats":                       # status keeps the segment label
+            self.last_stats = payload
+            line = (f"{format_telemetry(payload)}, "
+                    f"{payload.get('overflows', 0)} overflows, "
+                    f"{payload.get('lost', 0)} lost")
+            self.telemetry_var.set(line)
+            if TELEMETRY_STDOUT:
+                print(f"[INFO] {line}")
+            if self.telemetry_log is not None and self.worker is not None \
+                    and self.worker.writer is not None:
+                self.telemetry_log.write(payload, os.path.basename(self.worker.writer.path))
+
+        elif kind == "done":
+            fpath, nsamp, entry = payload
+            self.status.set(f"Saved {nsamp} samples to {os.path.basename(fpath)}")
+            # print summary to terminal
+            print(f"[DONE] {nsamp} samples saved → {fpath}")
+            if self.last_stats:
+                st = self.last_stats
+                print(f"       ingest: {st['rate_avg']:.1f} samples/s, "
+                      f"{st.get('overflows', 0)} overflows in {st.get('pulls', 0)} "
+                      f"pulls, {st['padded']} padded, {st['truncated']} truncated, "
+                      f"latency p50 {st['latency_p50_ms']:.1f} ms")
+                self.last_stats = None
+            self.telemetry_var.set("")
+            try:
+                ts = np.load(timestamps_path(fpath), mmap_mode="r")
+                srate = self.acq.srate if self.connected else None
+                print(f"       timing: {format_report(timing_report(ts, srate))}")
+            except Exception as e:
+                print(f"[WARN] Could not analyse timestamps: {e}")
+            if entry:
+                print(f"       array shape: ({entry['n_samples']}, "
+                      f"{entry['n_cols']}), dtype: {entry['dtype']}, "
+                      f"category: {entry['category']}")
+
+            self.rec_btn.config(text="●  Record", state="normal")
+            self.worker = None
+
+        elif kind == "error":
+            self.status.set(payload)
+            messagebox.showerror("Runtime error", payload)
+            self.rec_btn.config(text="●  Record", state="normal")
+            self.worker = None
+
 # ────────────────────────────────── run ─────────────────────────────────────
 if __name__ == "__main__":
     if sys.platform == "win32":
@@ -0,0 +1,173 @@
+"""
+capture_headless.py – record every matching LSL stream without a GUI.
+Run:  python capture_headless.py data/walking [--rotate-min 10] [--rotate-mb 200]
+      python capture_headless.py data/walking --telemetry --telemetry-csv t.csv
+
+One Acquisition + CaptureThread pair per stream, so each extra headset adds
+one inlet thread and one writer and nothing shared.  Files rotate by time
+or size; consecutive segments are cut on the same local-clock instant, so
+no sample is lost or written twice at a rotation.  New streams that appear
+later are picked up on the next rescan.  SIGINT/SIGTERM (and SIGHUP) close
+every file cleanly before exiting.  --telemetry prints each stream's
+rolling counters every second; --telemetry-csv logs them for profiling.
+"""
+import argparse, hashlib, os, queue, re, signal, sys, threading, time
+from pylsl import resolve_streams, local_clock
+from eeg_capture import CaptureThread, CHUNK_MAX, STORE_DTYPE
+from eeg_acquire import Acquisition
+from eeg_telemetry import TelemetryLog, format_telemetry
+
+RESCAN_EVERY = 10.0     # s between looks for new streams
+POLL_EVERY   = 0.5      # s between rotation / message checks
+
+def stream_prefix(info) -> str:
+    """File name prefix naming the stream, stable across sessions."""
+    name = re.sub(r"[^A-Za-z0-9-]+", "-", info.name()).strip("-") or "stream"
+    uid  = info.source_id() or info.uid()
+    return f"{name}_{hashlib.blake2b(uid.encode(), digest_size=3).hexdigest()}_"
+
+# ───────────────────────── one stream ───────────────────────────────────────
+class StreamSession:
+    """A stream's Acquisition and its current, rotating CaptureThread."""
+
+    def __init__(self, info, save_dir: str, rotate_s: float | None,
+                 rotate_bytes: int | None, dtype: str, codec: str | None,
+                 telemetry: bool = False, log: TelemetryLog | None = None):
+        self.info, self.save_dir = info, save_dir
+        self.telemetry, self.log = telemetry, log
+        self.rotate_s, self.rotate_bytes = rotate_s, rotate_bytes
+        self.dtype, self.codec = dtype, codec
+        self.prefix = stream_prefix(info)
+        self.q = queue.Queue()
+        self.acq = Acquisition(chunk_max=CHUNK_MAX, info=info)
+        self.acq.start()
+        self.seg: CaptureThread | None = None
+        self.closing: list[CaptureThread] = []      # stopped, still draining
+        self.files = self.samples = 0
+
+    @property
+    def label(self) -> str:
+        return self.prefix.rstrip("_")
+
+    def open(self, t: float):
+        self.seg = CaptureThread(self.save_dir, self.q, source=self.acq, start_t=t,
+                                 dtype=self.dtype, codec=self.codec,
+                                 prefix=self.prefix)
+        self.seg.start()
+
+    def due(self) -> bool:
+        if self.seg is None or not self.acq.ready.is_set():
+            return False
+        if self.rotate_s and local_clock() - self.seg.start_t >= self.rotate_s:
+            return True
+        w = self.seg.writer
+        return bool(self.rotate_bytes and w is not None
+                    and os.path.getsize(w.path) >= self.rotate_bytes)
+
+    def rotate(self, t: float):
+        self.seg.stop(t)
+        self.closing.append(self.seg)
+        self.open(t)
+
+    def poll(self):
+        self.closing = [c for c in self.closing if c.is_alive()]
+        while True:
+            try:
+                kind, payload = self.q.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "done":
+                fpath, nsamp, _ = payload
+                self.files, self.samples = self.files + 1, self.samples + nsamp
+                print(f"[DONE] {self.label}: {nsamp} samples → {fpath}")
+            elif kind == "error":
+                print(f"[WARN] {self.label}: {payload}", file=sys.stderr)
+            elif kind == "stats":
+                if self.telemetry:
+                    print(f"[INFO] {self.label}: {format_telemetry(payload)}")
+                if self.log is not None:
+                    self.log.write(payload, self.label)
+                if payload.get("lost"):
+                    print(f"[WARN] {self.label}: {payload['lost']} samples lost",
+                          file=sys.stderr)
+
+    def close(self, t: float):
+        if self.seg is not None:
+            self.seg.stop(t)
+            self.closing.append(self.seg)
+        for c in self.closing:
+            c.join()
+        self.poll()
+        self.acq.stop()
+        self.acq.join(timeout=1)
+
+# ───────────────────────── session loop ─────────────────────────────────────
+def run(save_dir: str, stream_type: str = "EEG", name: str | None = None,
+        rotate_s: float | None = None, rotate_bytes: int | None = None,
+        dtype: str = STORE_DTYPE, codec: str | None = None,
+        duration: float | None = None, telemetry: bool = False,
+        telemetry_csv: str | None = None):
+    stop = threading.Event()
+    for sig in ("SIGINT", "SIGTERM", "SIGHUP"):
+        if hasattr(signal, sig):
+            signal.signal(getattr(signal, sig), lambda *_: stop.set())
+
+    os.makedirs(save_dir, exist_ok=True)
+    sessions: dict[str, StreamSession] = {}
+    log = TelemetryLog(telemetry_csv) if telemetry_csv else None
+    t_stop = None if duration is None else time.monotonic() + duration
+    next_scan = 0.0
+    print(f"[INFO] Looking for {stream_type} streams"
+          f"{f' named {name!r}' if name else ''} – Ctrl+C to stop")
+    while not stop.is_set():
+        if time.monotonic() >= next_scan:
+            for info in resolve_streams(wait_time=1.0):   # all of them, not the first
+                key = info.source_id() or info.uid()
+                if (key in sessions or info.type() != stream_type
+                        or (name and info.name() != name)):
+                    continue
+                s = sessions[key] = StreamSession(info, save_dir, rotate_s,
+                                                  rotate_bytes, dtype, codec,
+                                                  telemetry, log)
+                s.open(local_clock())
+                print(f"[INFO] Recording {info.name()} ({info.channel_count()} ch, "
+                      f"{info.nominal_srate():g} Hz) as {s.label}")
+            next_scan = time.monotonic() + RESCAN_EVERY
+        t = local_clock()
+        for s in sessions.values():
+            if s.due():
+                s.rotate(t)
+            s.poll()
+        if t_stop is not None and time.monotonic() >= t_stop:
+            break
+        stop.wait(POLL_EVERY)
+
+    print("[INFO] Stopping, closing files…")
+    t = local_clock()                               # same cut for every stream
+    for s in sessions.values():
+        s.close(t)
+    for s in sessions.values():
+        print(f"[DONE] {s.label}: {s.files} files, {s.samples} samples")
+    if log is not None:
+        log.close()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("save_dir", help="category folder, e.g. data/walking")
+    ap.add_argument("--type", default="EEG", help="LSL stream type to record")
+    ap.add_argument("--name", help="only streams with this exact name")
+    ap.add_argument("--rotate-min", type=float, help="start a new file every N minutes")
+    ap.add_argument("--rotate-mb", type=float, help="… or once a file reaches N MB")
+    ap.add_argument("--dtype", default=STORE_DTYPE, choices=["float32", "float16"])
+    ap.add_argument("--codec", choices=["zlib", "lzma"], help="write .eegz")
+    ap.add_argument("--duration", type=float, help="stop after N seconds")
+    ap.add_argument("--telemetry", action="store_true",
+                    help="print rate, padding, latency and backlogs every second")
+    ap.add_argument("--telemetry-csv", help="append the same figures to this CSV")
+    args = ap.parse_args()
+
+    run(args.save_dir, args.type, args.name,
+        args.rotate_min * 60 if args.rotate_min else None,
+        int(args.rotate_mb * 2**20) if args.rotate_mb else None,
+        args.dtype, args.codec, args.duration, args.telemetry, args.telemetry_csv)
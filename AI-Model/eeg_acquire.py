@@ -0,0 +1,280 @@
+"""
+eeg_acquire.py – one LSL inlet shared by every consumer.
+
+`Acquisition` owns the inlet and writes sample blocks into a `SampleRing`.
+Consumers (recorder, viewer, feature extractors) each call `subscribe()` and
+get a `Cursor` with its own read position; reads return NumPy views into the
+ring, so nothing is copied or deserialised twice.  With `shared=True` the
+ring lives in shared memory and other processes can attach to it read-only.
+"""
+import threading, time, sys
+import numpy as np
+from multiprocessing import shared_memory
+from pylsl import StreamInlet, resolve_byprop, proc_clocksync
+from eeg_ingest import ChunkReader, IngestStats
+
+RING_SECONDS = 30       # history kept in the shared ring
+
+# ───────────────────────── helper ───────────────────────────────────────────
+def wait_for_eeg(timeout_per_try=5, retry_pause=2, processing_flags=0):
+    """Block until an EEG LSL stream appears, then return (inlet, info)."""
+    attempt = 0
+    while True:
+        streams = resolve_byprop("type", "EEG", timeout=timeout_per_try)
+        if streams:
+            info = streams[0]
+            print(f"[INFO] Connected to EEG stream: {info.name()} "
+                  f"({info.channel_count()} ch, {info.nominal_srate()} Hz)")
+            return StreamInlet(info, processing_flags=processing_flags), info
+        attempt += 1
+        print(f"[WARN] No EEG stream (attempt {attempt}), retrying…", file=sys.stderr)
+        time.sleep(retry_pause)
+
+# ───────────────────────── shared ring ──────────────────────────────────────
+class SampleRing:
+    """Single-writer, multi-reader ring of (samples × channels) blocks.
+
+    `head` counts every sample ever written; a reader position p lives at row
+    p % capacity.  Readers that fall more than `capacity` samples behind are
+    moved forward and the skipped samples are counted as lost.
+    """
+
+    HDR = 8                                         # int64 header slots (0 = head)
+
+    def __init__(self, capacity: int, n_chan: int, dtype=np.float32,
+                 buf=None):
+        self.capacity, self.n_chan = capacity, n_chan
+        self.dtype  = np.dtype(dtype)
+        self.closed = False                         # set by close(); reads come back empty
+        if buf is None:
+            buf = bytearray(self.nbytes(capacity, n_chan, dtype))
+        off = 8 * self.HDR
+        self._hdr = np.ndarray(self.HDR, np.int64, buf)
+        self.ts   = np.ndarray(capacity, np.float64, buf, off)
+        self.data = np.ndarray((capacity, n_chan), dtype, buf, off + 8 * capacity)
+        self.cond = threading.Condition()
+
+    @classmethod
+    def nbytes(cls, capacity: int, n_chan: int, dtype=np.float32) -> int:
+        return 8 * cls.HDR + 8 * capacity + capacity * n_chan * np.dtype(dtype).itemsize
+
+    @property
+    def head(self) -> int:
+        """Total samples ever written."""
+        return int(self._hdr[0])
+
+    def write(self, block: np.ndarray, ts):
+        k, head = len(block), self.head
+        if k > self.capacity:
+            block, ts = block[-self.capacity:], ts[-self.capacity:]
+            head += k - self.capacity
+            k = self.capacity
+        i = head % self.capacity
+        first = min(k, self.capacity - i)
+        self.data[i:i + first] = block[:first]
+        self.ts[i:i + first]   = ts[:first]
+        if first < k:
+            self.data[:k - first] = block[first:]
+            self.ts[:k - first]   = ts[first:]
+        with self.cond:
+            self._hdr[0] = head + k                 # publish only after the copy
+            self.cond.notify_all()
+
+    def wait(self, pos: int, timeout: float):
+        """Wait up to `timeout` s for samples past `pos`."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.closed or self.head != pos, timeout)
+
+    def subscribe(self, from_now: bool = True) -> "Cursor":
+        """New reader starting at the newest sample (or the oldest kept)."""
+        start = self.head if from_now else max(0, self.head - self.capacity)
+        return Cursor(self, start)
+
+    def subscribe_at(self, t: float) -> "Cursor":
+        """New reader starting at the first kept sample stamped >= `t`."""
+        head = self.head
+        lo   = max(0, head - self.capacity)
+        ts   = self.ts[np.arange(lo, head) % self.capacity]
+        return Cursor(self, lo + int(np.searchsorted(ts, t)))
+
+class Cursor:
+    """Independent read position on a SampleRing."""
+
+    def __init__(self, ring: SampleRing, pos: int):
+        self.ring, self.pos = ring, pos
+        self.stats = IngestStats()
+
+    def available(self) -> int:
+        return 0 if self.ring.closed else self.ring.head - self.pos
+
+    def skip(self, n: int) -> int:
+        """Move past up to `n` unread samples without reading them; they are
+        counted as lost.  Returns how many were skipped."""
+        n = max(0, min(n, self.available()))
+        self.pos += n
+        self.stats.lost += n
+        return n
+
+    def read(self, timeout: float = 0.0, max_samples: int | None = None):
+        """Return (block, timestamps) views of unread samples, maybe empty.
+
+        A read stops at the ring's wrap point, so call again for the rest.
+        The views stay valid until the writer laps this position, i.e. for
+        roughly `capacity` samples.
+        """
+        ring = self.ring
+        if not ring.closed and ring.head == self.pos and timeout > 0:
+            ring.wait(self.pos, timeout)
+        if ring.closed:                             # acquisition shut down
+            return np.zeros((0, ring.n_chan), ring.dtype), np.zeros(0)
+        head = ring.head
+        self.stats.pulls += 1
+        if head - self.pos > ring.capacity:         # lapped by the writer
+            self.stats.overflows += 1
+            self.stats.lost += head - self.pos - ring.capacity
+            self.pos = head - ring.capacity
+        i = self.pos % ring.capacity
+        k = min(head - self.pos, ring.capacity - i)
+        if max_samples is not None:
+            k = min(k, max_samples)
+        self.pos += k
+        self.stats.samples += k
+        return ring.data[i:i + k], ring.ts[i:i + k]
+
+class SharedSampleRing(SampleRing):
+    """SampleRing in `multiprocessing.shared_memory`.
+
+    The acquisition side creates it; other processes `attach()` by name and
+    poll for new samples, since a threading.Condition cannot cross processes.
+    """
+
+    def __init__(self, capacity: int, n_chan: int, dtype=np.float32,
+                 name: str | None = None):
+        create = name is None
+        size   = self.nbytes(capacity, n_chan, dtype)
+        # attaching children share the creator's resource tracker, so the
+        # block is unlinked once, by the creator, in close()
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=size if create else 0)
+        self.owner = create
+        super().__init__(capacity, n_chan, dtype, self.shm.buf)
+        if create:
+            self._hdr[:] = 0
+
+    @classmethod
+    def attach(cls, spec: dict) -> "SharedSampleRing":
+        return cls(spec["capacity"], spec["n_chan"], spec["dtype"], spec["name"])
+
+    def spec(self) -> dict:
+        """Everything another process needs to attach to this ring."""
+        return {"name": self.shm.name, "capacity": self.capacity,
+                "n_chan": self.n_chan, "dtype": self.dtype.str}
+
+    def wait(self, pos: int, timeout: float):
+        if self.owner:
+            return super().wait(pos, timeout)
+        end = time.perf_counter() + timeout
+        while not self.closed and self.head == pos and time.perf_counter() < end:
+            time.sleep(0.001)
+
+    def close(self):
+        """Stop every reader (their reads come back empty) and unlink the
+        block.  The mapping stays until this object is collected: blocks
+        already handed out are views into it that NumPy does not pin, so
+        unmapping now would crash a consumer still holding one."""
+        with self.cond:                             # wake in-process waiters
+            self.closed = True
+            self.cond.notify_all()
+        if self.owner:
+            self.shm.unlink()
+
+class RingSource:
+    """Attach to an Acquisition's shared ring from another process.
+
+    Offers the same `subscribe()` / `n_chan` / `srate` surface as Acquisition,
+    so start_live_viewer(source=...) works unchanged.
+    """
+
+    def __init__(self, spec: dict):
+        self.ring  = SharedSampleRing.attach(spec)
+        self.srate = spec["srate"]
+
+    @property
+    def n_chan(self) -> int:
+        return self.ring.n_chan
+
+    def subscribe(self, from_now: bool = True, timeout: float | None = None):
+        return self.ring.subscribe(from_now)
+
+# ───────────────────────── acquisition thread ───────────────────────────────
+class Acquisition(threading.Thread):
+    """Own the EEG inlet and publish everything it receives to a SampleRing.
+
+    `info` (a resolved pylsl StreamInfo) picks the stream to open; by default
+    it is the first EEG stream that appears.
+    """
+
+    def __init__(self, ring_seconds: float = RING_SECONDS,
+                 chunk_max: int = 512, shared: bool = False, info=None):
+        super().__init__(daemon=True)
+        self.ring_seconds, self.chunk_max = ring_seconds, chunk_max
+        self.shared = shared
+        self.ring: SampleRing | None = None
+        self.info  = info
+        self.ready = threading.Event()
+        self.stopflag = threading.Event()
+
+    @property
+    def n_chan(self) -> int:
+        return self.ring.n_chan
+
+    @property
+    def srate(self) -> float:
+        return self.info.nominal_srate() or 250
+
+    def subscribe(self, from_now: bool = True, timeout: float | None = None):
+        """Block until connected, then return a new Cursor (None on timeout)."""
+        if not self.ready.wait(timeout):
+            return None
+        return self.ring.subscribe(from_now)
+
+    def subscribe_at(self, t: float, timeout: float | None = None):
+        """Like subscribe(), but start at local-clock time `t` (pylsl.local_clock).
+
+        Ring timestamps are clock-synced, so a segment opened a few ms after
+        the Record press still begins exactly at the press.
+        """
+        if not self.ready.wait(timeout):
+            return None
+        return self.ring.subscribe_at(t)
+
+    def shared_spec(self, timeout: float | None = None) -> dict | None:
+        """Attach spec for RingSource in another process (needs shared=True)."""
+        if not self.ready.wait(timeout):
+            return None
+        return {**self.ring.spec(), "srate": self.srate}
+
+    def run(self):
+        # one inlet for the app's lifetime; liblsl reconnects it on its own
+        # if the device drops out, and clocksync puts timestamps on our clock
+        if self.info is None:
+            inlet, self.info = wait_for_eeg(processing_flags=proc_clocksync)
+        else:
+            inlet = StreamInlet(self.info, processing_flags=proc_clocksync)
+        reader = ChunkReader(inlet, inlet.channel_count,
+                             max_samples=self.chunk_max)
+        ring_cls  = SharedSampleRing if self.shared else SampleRing
+        self.ring = ring_cls(int(self.ring_seconds * self.srate),
+                             inlet.channel_count)
+        self.stats = reader.stats
+        self.ready.set()
+        while not self.stopflag.is_set():
+            block, ts = reader.pull(timeout=0.05)
+            if len(block):
+                self.ring.write(block, ts)
+        inlet.close_stream()
+        if self.shared:
+            self.ring.close()
+
+    def stop(self):
+        self.stopflag.set()
@@ -0,0 +1,230 @@
+"""
+eeg_capture.py – the recording backend: one CaptureThread writes one file.
+
+Shared by the Tk GUI (capture_gui_and_backend.py), capture_headless.py and
+bench_pipeline.py, and free of tkinter and matplotlib, so the headless
+recorder runs on machines without a display.
+"""
+import threading, queue, time, os, sys, numpy as np
+from pylsl import StreamInlet, resolve_byprop, local_clock
+from eeg_writer import NpyStreamWriter, Checkpointer, timestamps_path, checkpoint_path
+from eeg_compress import EegzWriter
+from eeg_catalog import Catalog
+from eeg_ingest import ChunkReader
+from eeg_markers import MarkerWriter
+from eeg_telemetry import Telemetry
+
+FFT_MAX_HZ  = 60    # keep first 60 bins per sample
+FLUSH_EVERY = 1024  # samples buffered in RAM before each write to disk
+CHUNK_MAX   = 512   # samples per pull_chunk call; 0 = one pull_sample per sample
+STATS_EVERY = 1.0   # seconds between ingestion stats messages
+STORE_DTYPE = "float32" # or "float16" to halve the files again
+STORE_CODEC = None      # None = plain .npy; "zlib"/"lzma" = chunked .eegz
+STOP_GRACE  = 0.5   # s to wait for samples stamped before the Stop press
+MARK_TAIL   = 8192  # recent timestamps kept to place markers that arrive late
+
+# ───────────────────────────────── helpers ──────────────────────────────────
+def new_recording_path(save_dir: str, ext: str = ".npy", prefix: str = "") -> str:
+    """data/<category>/<prefix><timestamp>.npy, suffixed if a trial already took it."""
+    stem  = os.path.join(save_dir, prefix + time.strftime("%Y%m%d_%H%M%S"))
+    fpath, n = stem + ext, 1
+    while os.path.exists(fpath):
+        fpath, n = f"{stem}_{n}{ext}", n + 1
+    return fpath
+
+def catalog_root(save_dir: str) -> str:
+    """The data root that owns a data/<category> folder."""
+    return os.path.dirname(os.path.normpath(save_dir)) or "."
+
+# ───────────────────────────────── capture thread ───────────────────────────
+class CaptureThread(threading.Thread):
+    """Record one file.
+
+    With `source` (an Acquisition) the thread is a segment on the already
+    flowing session stream: it covers exactly the samples stamped between
+    `start_t` and the stop() call, both on pylsl.local_clock.  Without one it
+    resolves and opens an inlet of its own, as it always did.
+    """
+
+    def __init__(self, save_dir: str, q: queue.Queue, source=None,
+                 start_t: float | None = None,
+                 flush_every: int = FLUSH_EVERY, chunk_max: int = CHUNK_MAX,
+                 dtype: str = STORE_DTYPE, codec: str | None = STORE_CODEC,
+                 prefix: str = ""):
+        super().__init__(daemon=True)
+        self.save_dir, self.q, self.source = save_dir, q, source
+        self.start_t = local_clock() if start_t is None else start_t
+        self.end_t: float | None = None
+        self.ts_offset = 0.0                        # remote → local LSL clock
+        self.flush_every, self.chunk_max = flush_every, chunk_max
+        self.dtype, self.codec = np.dtype(dtype), codec
+        self.prefix = prefix                        # file name prefix
+        self.writer = None
+        self.marks  = queue.SimpleQueue()           # (t, label) from mark()
+        self._pending: list[tuple[float, str]] = []
+        self._ts_tail = np.zeros(MARK_TAIL)         # ring of recent timestamps
+        self.marker_writer: MarkerWriter | None = None
+        self.ckpt: Checkpointer | None = None
+        self.telemetry = Telemetry(FFT_MAX_HZ)
+        self.stopflag = threading.Event()
+
+    def run(self):
+        inlet = cursor = None
+        try:
+            if self.source is not None:
+                cursor = self.source.subscribe_at(self.start_t, timeout=5)
+                if cursor is None:
+                    raise RuntimeError("no EEG stream found")
+                opened_ms = (local_clock() - self.start_t) * 1e3
+            else:
+                streams = resolve_byprop("type", "EEG", timeout=5)
+                inlet   = StreamInlet(streams[0])
+                self.ts_offset = inlet.time_correction(timeout=2)
+        except Exception as e:
+            self.q.put(("error", f"LSL error: {e}"))
+            return
+
+        # stream straight to disk; the files are valid after every flush.
+        # Samples go to x.npy (or x.eegz), their LSL timestamps to x.ts.npy.
+        if self.codec:
+            fpath = new_recording_path(self.save_dir, ".eegz", self.prefix)
+            self.writer = EegzWriter(fpath, FFT_MAX_HZ, self.dtype,
+                                     block_rows=self.flush_every, codec=self.codec)
+        else:
+            fpath = new_recording_path(self.save_dir, prefix=self.prefix)
+            self.writer = NpyStreamWriter(fpath, FFT_MAX_HZ, self.dtype,
+                                          block_rows=self.flush_every)
+        self.ts_writer = NpyStreamWriter(timestamps_path(fpath), None,
+                                         np.float64, block_rows=self.flush_every)
+        # blocks are written and fsync'd off this thread; x.ckpt.json marks
+        # the recording as in progress until it is closed cleanly
+        self.ckpt = Checkpointer(checkpoint_path(fpath), [self.writer, self.ts_writer],
+                                 meta={"recording": os.path.basename(fpath),
+                                       "start_t": self.start_t})
+        self.ckpt.start()
+
+        if cursor is not None:
+            self.q.put(("status", f"Recording… (segment opened {opened_ms:.1f} ms "
+                                  f"after press)"))
+        else:
+            self.q.put(("status", "Recording…"))
+        try:
+            if cursor is not None:
+                self._run_chunked(cursor.read, cursor.stats, cursor.available,
+                                  trim=True)
+            elif self.chunk_max:
+                reader = ChunkReader(inlet, FFT_MAX_HZ, max_samples=self.chunk_max)
+                self._run_chunked(reader.pull, reader.stats, inlet.samples_available)
+            else:
+                self._run_per_sample(inlet)
+        finally:
+            self._place_marks(final=True)
+            self.ckpt.close()
+            nsamp = self.writer.n_rows
+            if self.marker_writer is not None:
+                self.marker_writer.close()
+
+        # index it so nobody has to re-open the file to learn its shape
+        try:
+            with Catalog(catalog_root(self.save_dir)) as cat:
+                entry = cat.add(fpath)
+        except Exception as e:
+            print(f"[WARN] Could not update catalog: {e}", file=sys.stderr)
+            entry = None
+
+        # send file path, sample count & catalog entry back to GUI
+        self.q.put(("done", (fpath, nsamp, entry)))
+
+    # ── ingestion loops ─────────────────────────────────────────────────────
+    def _write(self, block, ts):
+        n0 = len(self.writer)
+        ts = np.atleast_1d(np.asarray(ts) + self.ts_offset)
+        if not len(ts):
+            return
+        self.writer.append(block)                   # pads/truncates to FFT_MAX_HZ
+        self.ts_writer.append(ts)
+        self.telemetry.record(len(ts), np.shape(block)[-1], ts[-1])
+        k = min(len(ts), MARK_TAIL)
+        self._ts_tail[(n0 + len(ts) - k + np.arange(k)) % MARK_TAIL] = ts[-k:]
+        if self._pending or not self.marks.empty():
+            self._place_marks()
+
+    def _place_marks(self, final: bool = False):
+        """Give queued markers the offset of the first sample stamped at or
+        after them, once that sample is written (or the recording ends).
+        Markers that arrive after their sample are placed from the tail of
+        recent timestamps."""
+        while not self.marks.empty():
+            self._pending.append(self.marks.get())
+        self._pending.sort()
+        n    = len(self.writer)
+        lo   = max(0, n - MARK_TAIL)
+        tail = self._ts_tail[np.arange(lo, n) % MARK_TAIL]
+        keep = []
+        for t, label in self._pending:
+            if final and self.end_t is not None and t >= self.end_t:
+                continue                            # after the cut
+            if not final and (n == 0 or t > tail[-1]):
+                keep.append((t, label))             # its sample is not in yet
+                continue
+            if self.marker_writer is None:
+                self.marker_writer = MarkerWriter(self.writer.path)
+            self.marker_writer.add(lo + int(np.searchsorted(tail, t)), t, label)
+        self._pending = keep
+
+    def mark(self, label: str, t: float | None = None):
+        """Record a marker at local-clock time `t` (default: now); `END`
+        closes the current segment.  Safe to call from any thread."""
+        self.marks.put((local_clock() if t is None else t, label))
+
+    def _report(self, stats=None, queue_depth: int = 0):
+        """Post ingest counters and telemetry as one ("stats", {...}) message."""
+        snap = self.telemetry.snapshot(self.writer, self.ckpt, queue_depth)
+        self.q.put(("stats", {**(stats.summary() if stats else {}), **snap}))
+
+    def _run_chunked(self, pull, stats, backlog, trim: bool = False):
+        """Copy blocks to the writer until stopped.  With `trim`, drop samples
+        stamped before start_t, keep going after stop() until the stream
+        passes end_t, then cut there.  `backlog()` is the number of samples
+        waiting behind the reader."""
+        next_report = time.perf_counter() + STATS_EVERY
+        deadline = None
+        while True:
+            if deadline is None and self.stopflag.is_set():
+                if not trim:
+                    break
+                deadline = time.perf_counter() + STOP_GRACE
+            block, ts = pull(timeout=0.05)
+            if trim and len(ts) and ts[0] < self.start_t:
+                # stamped before start_t but arrived after the segment opened
+                k = int(np.searchsorted(ts, self.start_t))
+                block, ts = block[k:], ts[k:]
+            if trim and self.end_t is not None:     # set by stop(), maybe mid-pull
+                n = int(np.searchsorted(ts, self.end_t))
+                self._write(block[:n], ts[:n])
+                if n < len(block) or (deadline is not None
+                                      and time.perf_counter() > deadline):
+                    break
+            elif len(block):
+                self._write(block, ts)
+            if time.perf_counter() >= next_report:
+                self._report(stats, backlog())
+                next_report += STATS_EVERY
+        self._report(stats, backlog())
+
+    def _run_per_sample(self, inlet):
+        next_report = time.perf_counter() + STATS_EVERY
+        while not self.stopflag.is_set():
+            sample, ts = inlet.pull_sample(timeout=0.1)
+            if sample:
+                self._write(sample, ts)             # writer pads/truncates
+            if time.perf_counter() >= next_report:
+                self._report(queue_depth=inlet.samples_available())
+                next_report += STATS_EVERY
+        self._report()
+
+    def stop(self, t: float | None = None):
+        """End the segment at local-clock time `t` (default: now), so the
+        next segment can start at exactly the same instant."""
+        self.end_t = local_clock() if t is None else t
+        self.stopflag.set()
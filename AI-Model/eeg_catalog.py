@@ -0,0 +1,189 @@
+"""
+eeg_catalog.py – cached index of the data/<category>/ recording tree.
+Run:  python eeg_catalog.py data            # update, then list categories
+      python eeg_catalog.py data --files    # … and every recording
+
+The catalog is a SQLite file (data/catalog.sqlite) holding shape, dtype,
+sample count, duration and category per recording.  `update()` re-probes
+only files whose mtime or size changed, and probing reads headers, never the
+samples, so listing or splitting thousands of recordings is a single query.
+"""
+import argparse, hashlib, os, sqlite3, sys, time
+import numpy as np
+from eeg_writer import timestamps_path
+from eeg_compress import EegzReader, is_recording
+
+CATALOG_NAME = "catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    path       TEXT PRIMARY KEY,   -- relative to the data root, '/' separated
+    category   TEXT NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    size       INTEGER NOT NULL,
+    n_samples  INTEGER NOT NULL,
+    n_cols     INTEGER,
+    dtype      TEXT NOT NULL,
+    duration_s REAL                -- from the .ts.npy sidecar, if any
+);
+CREATE INDEX IF NOT EXISTS recordings_category ON recordings(category);
+"""
+_COLS = ("path", "category", "mtime_ns", "size", "n_samples", "n_cols",
+         "dtype", "duration_s")
+
+# ───────────────────────── probing ──────────────────────────────────────────
+def _npy_header(path: str):
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) \
+               else np.lib.format.read_array_header_2_0
+        shape, _, dtype = read(f)
+    return shape, dtype
+
+def probe(path: str) -> dict:
+    """Shape, dtype and duration of one recording, from headers only."""
+    if path.endswith(".eegz"):
+        with EegzReader(path) as r:
+            shape, dtype = r.shape, r.dtype
+    else:
+        shape, dtype = _npy_header(path)
+    duration = None
+    tpath = timestamps_path(path)
+    if os.path.exists(tpath):
+        ts = np.load(tpath, mmap_mode="r")
+        if len(ts) > 1:
+            duration = float(ts[-1] - ts[0])
+    return {"n_samples": int(shape[0]) if shape else 0,
+            "n_cols": int(shape[1]) if len(shape) > 1 else None,
+            "dtype": np.dtype(dtype).str, "duration_s": duration}
+
+# ───────────────────────── catalog ──────────────────────────────────────────
+class Catalog:
+    """SQLite index of every recording under `root`."""
+
+    def __init__(self, root: str = "data", db_path: str | None = None):
+        self.root = root
+        self.db = sqlite3.connect(db_path or os.path.join(root, CATALOG_NAME),
+                                  timeout=10)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _scan(self):
+        """(relative path, stat) for every recording below the root."""
+        stack = [self.root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    if e.is_dir():
+                        stack.append(e.path)
+                    elif is_recording(e.name):
+                        yield self._rel(e.path), e.stat()
+
+    def _upsert(self, rel: str, st):
+        info = probe(os.path.join(self.root, rel))
+        row  = (rel, rel.split("/")[0], st.st_mtime_ns, st.st_size,
+                info["n_samples"], info["n_cols"], info["dtype"], info["duration_s"])
+        self.db.execute(f"INSERT OR REPLACE INTO recordings VALUES "
+                        f"({','.join('?' * len(_COLS))})", row)
+
+    def add(self, path: str) -> dict:
+        """Index (or re-index) one recording, e.g. right after it is saved."""
+        rel = self._rel(path)
+        self._upsert(rel, os.stat(path))
+        self.db.commit()
+        return self.get(path)
+
+    def update(self) -> tuple[int, int, int]:
+        """Sync with the disk; return (added, changed, removed) counts."""
+        known = {r["path"]: (r["mtime_ns"], r["size"]) for r in
+                 self.db.execute("SELECT path, mtime_ns, size FROM recordings")}
+        added = changed = 0
+        seen = set()
+        for rel, st in self._scan():
+            if "/" not in rel:                      # loose file, no category
+                continue
+            seen.add(rel)
+            old = known.get(rel)
+            if old == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                self._upsert(rel, st)
+            except Exception as e:
+                print(f"[WARN] cannot index {rel}: {e}", file=sys.stderr)
+                continue
+            added, changed = (added + 1, changed) if old is None else (added, changed + 1)
+        gone = [(p,) for p in known.keys() - seen]
+        self.db.executemany("DELETE FROM recordings WHERE path = ?", gone)
+        self.db.commit()
+        return added, changed, len(gone)
+
+    # ── queries ─────────────────────────────────────────────────────────────
+    def get(self, path: str) -> dict | None:
+        row = self.db.execute("SELECT * FROM recordings WHERE path = ?",
+                              (self._rel(path),)).fetchone()
+        return dict(row) if row else None
+
+    def entries(self, category: str | None = None) -> list[dict]:
+        if category is None:
+            rows = self.db.execute("SELECT * FROM recordings ORDER BY path")
+        else:
+            rows = self.db.execute("SELECT * FROM recordings WHERE category = ? "
+                                   "ORDER BY path", (category,))
+        return [dict(r) for r in rows]
+
+    def categories(self) -> dict[str, dict]:
+        rows = self.db.execute(
+            "SELECT category, COUNT(*) AS files, SUM(n_samples) AS samples, "
+            "SUM(duration_s) AS duration_s FROM recordings GROUP BY category "
+            "ORDER BY category")
+        return {r["category"]: dict(r) for r in rows}
+
+    def split(self, val_frac: float = 0.2, salt: str = "") -> tuple[list, list]:
+        """(train, val) entries split by a hash of the path, so a recording
+        keeps its side of the split as the corpus grows."""
+        train, val = [], []
+        for e in self.entries():
+            h = hashlib.blake2b((salt + e["path"]).encode(), digest_size=8).digest()
+            (val if int.from_bytes(h, "little") / 2**64 < val_frac else train).append(e)
+        return train, val
+
+    def files(self, entries=None) -> dict[str, list[tuple[str, int]]]:
+        """{category: [(path, n_samples)]}, the shape EEGDataset takes."""
+        out: dict[str, list] = {}
+        for e in self.entries() if entries is None else entries:
+            out.setdefault(e["category"], []).append(
+                (os.path.join(self.root, e["path"]), e["n_samples"]))
+        return out
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("root", nargs="?", default="data")
+    ap.add_argument("--files", action="store_true", help="list every recording")
+    args = ap.parse_args()
+
+    with Catalog(args.root) as cat:
+        t0 = time.perf_counter()
+        added, changed, removed = cat.update()
+        t1 = time.perf_counter()
+        print(f"[INFO] update: +{added} ~{changed} -{removed} "
+              f"in {(t1 - t0) * 1e3:.1f} ms")
+        for name, c in cat.categories().items():
+            dur = f", {c['duration_s']:.0f} s" if c["duration_s"] else ""
+            print(f"{name:>16}: {c['files']} files, {c['samples']} samples{dur}")
+        if args.files:
+            for e in cat.entries():
+                print(f"  {e['path']}: {e['n_samples']}×{e['n_cols']} {e['dtype']}")
+        print(f"[INFO] listing took {(time.perf_counter() - t1) * 1e3:.1f} ms")
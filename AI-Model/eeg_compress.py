@@ -0,0 +1,200 @@
+"""
+eeg_compress.py – chunk-compressed recording container (.eegz), stdlib only.
+
+Layout:  head | chunk* | index | footer
+  head   b"EEGZ" + u8 version + u32 length + JSON {dtype, n_cols, codec, …}
+  chunk  u32 rows + u32 nbytes + compressed payload
+  index  int64 (offset, rows) per chunk
+  footer u64 index offset + u64 chunk count + b"EEGZIDX\\0"
+
+Each chunk is encoded on its own (channel-major, optional integer delta on
+the sample bit patterns, byte shuffle, then zlib or lzma), so a reader can
+decode any one chunk without touching the rest.  Everything is lossless for
+the chosen storage dtype.  A file without footer (writer died) is indexed by
+scanning the chunk headers instead.
+"""
+import json, lzma, os, struct, zlib
+import numpy as np
+from eeg_writer import BlockWriter, is_sidecar
+
+MAGIC, VERSION = b"EEGZ", 1
+FOOTER_MAGIC   = b"EEGZIDX\0"
+_CHUNK = struct.Struct("<II")
+_FOOT  = struct.Struct("<QQ8s")
+_UINT  = {1: np.uint8, 2: np.uint16, 4: np.uint32, 8: np.uint64}
+
+CODECS = {
+    "zlib": (lambda b, lvl: zlib.compress(b, 6 if lvl is None else lvl),
+             zlib.decompress),
+    "lzma": (lambda b, lvl: lzma.compress(b, preset=6 if lvl is None else lvl),
+             lzma.decompress),
+    "none": (lambda b, lvl: b, lambda b: b),
+}
+
+# ───────────────────────── chunk codec ──────────────────────────────────────
+def encode_chunk(rows: np.ndarray, codec: str, delta: bool,
+                 level: int | None = None) -> bytes:
+    """(rows × cols) array → compressed bytes."""
+    u = np.ascontiguousarray(rows.T).view(_UINT[rows.itemsize])
+    if delta:
+        d = u.copy()
+        d[:, 1:] -= u[:, :-1]                       # wraps, so it is exact
+        u = d
+    planes = u.view(np.uint8).reshape(-1, u.itemsize).T   # byte shuffle
+    return CODECS[codec][0](planes.tobytes(), level)
+
+def decode_chunk(payload: bytes, n_rows: int, n_cols: int, dtype,
+                 codec: str, delta: bool) -> np.ndarray:
+    """Inverse of encode_chunk."""
+    dtype = np.dtype(dtype)
+    raw   = np.frombuffer(CODECS[codec][1](payload), np.uint8)
+    u = raw.reshape(dtype.itemsize, -1).T.copy().view(_UINT[dtype.itemsize])
+    u = u.reshape(n_cols, n_rows)
+    if delta:
+        u = np.cumsum(u, axis=1, dtype=u.dtype)
+    return np.ascontiguousarray(u.view(dtype).T)
+
+# ───────────────────────── writer ───────────────────────────────────────────
+class EegzWriter(BlockWriter):
+    """Same interface as NpyStreamWriter, but every block becomes one
+    independently compressed chunk."""
+
+    def __init__(self, path: str, n_cols: int | None, dtype=np.float32,
+                 block_rows: int = 1024, codec: str = "zlib",
+                 delta: bool = False, level: int | None = None):
+        if codec not in CODECS:
+            raise ValueError(f"unknown codec {codec!r} (use {', '.join(CODECS)})")
+        super().__init__(path, n_cols, dtype, block_rows)
+        self.codec, self.delta, self.level = codec, delta, level
+        self._index: list[tuple[int, int]] = []
+        meta = json.dumps({"dtype": self.dtype.str, "n_cols": self.n_cols,
+                           "vector": self.vector, "codec": codec,
+                           "delta": delta, "chunk_rows": block_rows}).encode()
+        self._f.write(MAGIC + bytes([VERSION]) + struct.pack("<I", len(meta)) + meta)
+
+    def _write_block(self, rows: np.ndarray):
+        payload = encode_chunk(rows, self.codec, self.delta, self.level)
+        self._index.append((self._f.tell(), len(rows)))
+        self._f.write(_CHUNK.pack(len(rows), len(payload)) + payload)
+
+    def _finish(self):
+        at = self._f.tell()
+        self._f.write(np.asarray(self._index, "<i8").reshape(-1, 2).tobytes())
+        self._f.write(_FOOT.pack(at, len(self._index), FOOTER_MAGIC))
+
+# ───────────────────────── reader ───────────────────────────────────────────
+class EegzReader:
+    """Random access to an .eegz file, one chunk at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f   = open(path, "rb")
+        if self._f.read(4) != MAGIC:
+            raise ValueError(f"{path}: not an .eegz file")
+        self._f.read(1)                             # version
+        (n,) = struct.unpack("<I", self._f.read(4))
+        self.meta  = json.loads(self._f.read(n))
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.n_cols = self.meta["n_cols"]
+        index = self._read_index()
+        self.offsets = index[:, 0]
+        self.starts  = np.concatenate(([0], np.cumsum(index[:, 1])))
+        self.n_rows  = int(self.starts[-1])
+
+    def _read_index(self) -> np.ndarray:
+        size = os.fstat(self._f.fileno()).st_size
+        data_start = self._f.tell()
+        if size - data_start >= _FOOT.size:
+            self._f.seek(size - _FOOT.size)
+            at, count, magic = _FOOT.unpack(self._f.read(_FOOT.size))
+            if magic == FOOTER_MAGIC:
+                self._f.seek(at)
+                return np.frombuffer(self._f.read(16 * count), "<i8").reshape(-1, 2)
+        # no footer: walk the chunk headers, dropping a torn last chunk
+        index, pos = [], data_start
+        while pos + _CHUNK.size <= size:
+            self._f.seek(pos)
+            rows, nbytes = _CHUNK.unpack(self._f.read(_CHUNK.size))
+            if pos + _CHUNK.size + nbytes > size:
+                break
+            index.append((pos, rows))
+            pos += _CHUNK.size + nbytes
+        return np.asarray(index, np.int64).reshape(-1, 2)
+
+    @property
+    def shape(self) -> tuple:
+        return (self.n_rows,) if self.meta["vector"] else (self.n_rows, self.n_cols)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.offsets)
+
+    def read_chunk(self, i: int) -> np.ndarray:
+        self._f.seek(int(self.offsets[i]))
+        rows, nbytes = _CHUNK.unpack(self._f.read(_CHUNK.size))
+        block = decode_chunk(self._f.read(nbytes), rows, self.n_cols, self.dtype,
+                             self.meta["codec"], self.meta["delta"])
+        return block[:, 0] if self.meta["vector"] else block
+
+    def read(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Rows [start, stop), decoding only the chunks that overlap them."""
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        if start >= stop:
+            return np.empty((0,) + self.shape[1:], self.dtype)
+        first = int(np.searchsorted(self.starts, start, "right")) - 1
+        last  = int(np.searchsorted(self.starts, stop, "left"))
+        parts = [self.read_chunk(i) for i in range(first, last)]
+        out   = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        base  = int(self.starts[first])
+        return out[start - base:stop - base]
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def repair_eegz(path: str, max_rows: int | None = None) -> int:
+    """Give a footer-less (crashed) .eegz its index and footer back, keeping
+    whole chunks up to `max_rows`; return the rows kept."""
+    with EegzReader(path) as r:
+        keep = r.n_chunks if max_rows is None else \
+               int(np.searchsorted(r.starts, max_rows, "right")) - 1
+        index = np.stack([r.offsets[:keep], np.diff(r.starts[:keep + 1])], axis=1)
+        if keep:
+            r._f.seek(int(r.offsets[keep - 1]))
+            _, nbytes = _CHUNK.unpack(r._f.read(_CHUNK.size))
+            end = int(r.offsets[keep - 1]) + _CHUNK.size + nbytes
+        else:
+            r._f.seek(0)
+            r._f.read(5)
+            (n,) = struct.unpack("<I", r._f.read(4))
+            end = 9 + n
+        rows = int(r.starts[keep])
+    with open(path, "r+b") as f:
+        f.truncate(end)
+        f.seek(end)
+        f.write(np.asarray(index, "<i8").reshape(-1, 2).tobytes())
+        f.write(_FOOT.pack(end, keep, FOOTER_MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    return rows
+
+# ───────────────────────── helpers ──────────────────────────────────────────
+RECORDING_EXTS = (".npy", ".eegz")
+
+def is_recording(path: str) -> bool:
+    return path.endswith(RECORDING_EXTS) and not is_sidecar(path)
+
+def load_recording(path: str, mmap: bool = True) -> np.ndarray:
+    """Load a .npy (memory-mapped by default) or a whole .eegz recording."""
+    if path.endswith(".eegz"):
+        with EegzReader(path) as r:
+            return r.read()
+    return np.load(path, mmap_mode="r" if mmap else None)
@@ -0,0 +1,234 @@
+"""
+eeg_dataset.py – windowed training data from the data/<category>/ tree.
+Run:  python eeg_dataset.py data --window 128 --batch 64
+
+Every category folder becomes a label.  Recordings are opened with
+np.load(mmap_mode="r") (.eegz via EegzReader) and only the windows a batch
+needs are read, so a corpus larger than RAM trains fine.  The index of
+windows is two small integer arrays, never the data itself.  Built from the
+eeg_catalog index, no recording is even opened until a batch needs it.
+With --markers, labels come from the eeg_markers track of each recording
+instead of its folder, and windows stay inside one labelled segment.
+"""
+import argparse, glob, os, sys, time
+import numpy as np
+from eeg_compress import EegzReader, is_recording
+from eeg_catalog import Catalog
+from eeg_markers import read_markers, segments
+
+# ───────────────────────── discovery ────────────────────────────────────────
+def discover(root: str = "data", categories=None) -> dict[str, list[str]]:
+    """{category: [recording paths]} for every sub-folder of `root`."""
+    cats = categories or sorted(d for d in os.listdir(root)
+                                if os.path.isdir(os.path.join(root, d)))
+    out = {}
+    for cat in cats:
+        files = sorted(glob.glob(os.path.join(root, cat, "**", "*"), recursive=True))
+        out[cat] = [f for f in files if is_recording(f)]
+    return out
+
+def open_recording(path: str):
+    """Sliceable, lazily read view of a recording."""
+    if path.endswith(".eegz"):
+        return _EegzRows(EegzReader(path))
+    return np.load(path, mmap_mode="r")
+
+def load_segments(path: str) -> dict[str, list]:
+    """{label: [samples of each segment]} from a recording's marker track.
+
+    For .npy these are slices of one memory map, so nothing is read or
+    copied until the caller touches the rows.
+    """
+    rec, out = open_recording(path), {}
+    for label, a, b in segments(read_markers(path), len(rec)):
+        out.setdefault(label, []).append(rec[a:b])
+    return out
+
+def _majority_width(entries) -> tuple[int | None, list[dict]]:
+    """(most common channel count, the catalog entries that have it)."""
+    widths = [e["n_cols"] for e in entries if e["n_cols"]]
+    n_cols = max(set(widths), key=widths.count) if widths else None
+    return n_cols, [e for e in entries if e["n_cols"] == n_cols]
+
+class _EegzRows:
+    """Minimal array-like over EegzReader: len(), .shape and row slicing."""
+
+    def __init__(self, reader: EegzReader):
+        self.reader, self.shape = reader, reader.shape
+
+    def __len__(self):
+        return self.reader.n_rows
+
+    def __getitem__(self, sl: slice):
+        return self.reader.read(sl.start or 0, sl.stop)
+
+# ───────────────────────── dataset ──────────────────────────────────────────
+class EEGDataset:
+    """Fixed-length windows over recordings, labelled by category folder.
+
+    `files` maps category → paths, or → (path, n_samples) pairs when the
+    lengths are already known (then `n_cols` must be given too), or →
+    (path, n_samples, start, stop) to use only that range of a recording.
+    """
+
+    def __init__(self, files: dict[str, list], window: int = 128,
+                 stride: int | None = None, classes: list[str] | None = None,
+                 n_cols: int | None = None):
+        self.window = window
+        self.stride = stride or window
+        self.classes = classes or sorted(files)
+        self.paths, self.labels, self.lengths, self.spans = [], [], [], []
+        self._open: dict[str, object] = {}          # path → opened recording
+        file_idx, starts = [], []
+        for cat, items in files.items():
+            for item in items:
+                if isinstance(item, str):
+                    item = (item, None)
+                path, n = item[:2]
+                lo, hi  = item[2:] if len(item) == 4 else (0, None)
+                if n is None:
+                    rec = open_recording(path)
+                    if len(rec.shape) != 2 or (n_cols and rec.shape[1] != n_cols):
+                        print(f"[WARN] skipping {path}: shape {rec.shape}",
+                              file=sys.stderr)
+                        continue
+                    n_cols, n = rec.shape[1], len(rec)
+                    self._open[path] = rec
+                hi = n if hi is None else min(hi, n)
+                s = np.arange(lo, hi - window + 1, self.stride)
+                if len(s) == 0:
+                    continue
+                file_idx.append(np.full(len(s), len(self.paths), np.int32))
+                starts.append(s)
+                self.paths.append(path)
+                self.labels.append(self.classes.index(cat))
+                self.lengths.append(n)
+                self.spans.append((lo, hi))
+        self.n_cols  = n_cols or 0
+        self.file_idx = np.concatenate(file_idx) if file_idx else np.zeros(0, np.int32)
+        self.starts   = np.concatenate(starts) if starts else np.zeros(0, np.int64)
+        self.labels   = np.asarray(self.labels, np.int32)
+
+    @classmethod
+    def from_root(cls, root: str = "data", window: int = 128,
+                  stride: int | None = None, categories=None) -> "EEGDataset":
+        files = discover(root, categories)
+        return cls(files, window, stride, sorted(files))
+
+    @classmethod
+    def from_catalog(cls, root: str = "data", window: int = 128,
+                     stride: int | None = None, entries=None) -> "EEGDataset":
+        """Build from the catalog (updated first) without opening any file.
+
+        `entries` restricts it to some catalog rows, e.g. one side of
+        Catalog.split().
+        """
+        with Catalog(root) as cat:
+            cat.update()
+            classes = sorted(cat.categories())
+            n_cols, entries = _majority_width(cat.entries() if entries is None
+                                              else entries)
+            files = cat.files(entries)
+        return cls(files, window, stride, classes, n_cols)
+
+    @classmethod
+    def from_markers(cls, root: str = "data", window: int = 128,
+                     stride: int | None = None, entries=None) -> "EEGDataset":
+        """Label windows by marker segment instead of folder.
+
+        Only recordings with a marker track take part; each labelled segment
+        becomes one (path, n, start, stop) item, so no window straddles two
+        labels.
+        """
+        with Catalog(root) as cat:
+            cat.update()
+            entries = cat.entries() if entries is None else entries
+        n_cols, entries = _majority_width(entries)
+        files: dict[str, list] = {}
+        for e in entries:
+            path = os.path.join(root, e["path"])
+            for label, a, b in segments(read_markers(path), e["n_samples"]):
+                files.setdefault(label, []).append((path, e["n_samples"], a, b))
+        return cls(files, window, stride, sorted(files), n_cols)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def split(self, val_frac: float = 0.2, seed: int = 0):
+        """(train, val) split by whole recording, so windows never leak."""
+        rng  = np.random.default_rng(seed)
+        uniq = list(dict.fromkeys(self.paths))      # segments share a recording
+        draw = dict(zip(uniq, rng.random(len(uniq)) < val_frac))
+        val  = np.array([draw[p] for p in self.paths], bool)
+        sets = []
+        for keep in (~val, val):
+            files: dict[str, list[str]] = {c: [] for c in self.classes}
+            for i in np.flatnonzero(keep):
+                files[self.classes[self.labels[i]]].append(
+                    (self.paths[i], self.lengths[i], *self.spans[i]))
+            sets.append(EEGDataset(files, self.window, self.stride, self.classes,
+                                   self.n_cols))
+        return tuple(sets)
+
+    # ── reading ─────────────────────────────────────────────────────────────
+    def _rec(self, i: int):
+        path = self.paths[i]
+        rec = self._open.get(path)
+        if rec is None:
+            rec = self._open[path] = open_recording(path)
+        return rec
+
+    def take(self, idx: np.ndarray):
+        """Windows `idx` as (x [n, window, cols] float32, y [n] int32)."""
+        x = np.empty((len(idx), self.window, self.n_cols), np.float32)
+        order = np.lexsort((self.starts[idx], self.file_idx[idx]))  # file order
+        for j in order:
+            f, s = self.file_idx[idx[j]], self.starts[idx[j]]
+            x[j] = self._rec(f)[s:s + self.window]
+        return x, self.labels[self.file_idx[idx]]
+
+    def batches(self, batch_size: int = 64, shuffle: bool = True,
+                seed: int | None = None, drop_last: bool = False):
+        """Lazy generator of (x, y) batches over one epoch."""
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle \
+                else np.arange(len(self))
+        stop = len(order) - (len(order) % batch_size if drop_last else 0)
+        for i in range(0, stop, batch_size):
+            yield self.take(order[i:i + batch_size])
+
+    def as_tf_dataset(self, batch_size: int = 64, shuffle: bool = True,
+                      seed: int | None = None):
+        """The same batches as a prefetching tf.data.Dataset (one epoch per
+        iteration; TensorFlow is imported only here)."""
+        import tensorflow as tf
+        sig = (tf.TensorSpec((None, self.window, self.n_cols), tf.float32),
+               tf.TensorSpec((None,), tf.int32))
+        ds = tf.data.Dataset.from_generator(
+            lambda: self.batches(batch_size, shuffle, seed), output_signature=sig)
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("root", nargs="?", default="data")
+    ap.add_argument("--window", type=int, default=128)
+    ap.add_argument("--stride", type=int)
+    ap.add_argument("--batch", type=int, default=64)
+    ap.add_argument("--no-catalog", action="store_true",
+                    help="open every file instead of using the catalog")
+    ap.add_argument("--markers", action="store_true",
+                    help="label by marker segments instead of folders")
+    args = ap.parse_args()
+
+    build = EEGDataset.from_markers if args.markers else \
+            EEGDataset.from_root if args.no_catalog else EEGDataset.from_catalog
+    ds = build(args.root, args.window, args.stride)
+    counts = np.bincount(ds.labels[ds.file_idx], minlength=len(ds.classes))
+    for cat, n in zip(ds.classes, counts):
+        print(f"{cat:>16}: {n} windows")
+    t0, n = time.perf_counter(), 0
+    for x, y in ds.batches(args.batch):
+        n += len(x)
+    dt = time.perf_counter() - t0
+    print(f"[INFO] one epoch: {n} windows in {dt:.3f} s "
+          f"({n / dt if dt else 0:.0f} windows/s)")
@@ -0,0 +1,225 @@
+"""
+eeg_features.py – streaming sliding-window features for live EEG.
+Run:  python eeg_features.py --bench --channels 64 --srate 256
+
+`StreamingFeatures` turns sample blocks into per-window band powers,
+per-channel mean/variance and spectral entropy.  `SlidingWindows` writes
+samples twice into a mirrored buffer, so every window is a contiguous
+stride-trick view and all windows completed by a block go through one
+batched rfft.  Mean and variance come from running prefix sums, so a block
+costs work for its own samples and the windows it completes, never a pass
+over the history.
+
+`FeatureStage` runs it as a consumer of the shared Acquisition ring.
+"""
+import argparse, queue, threading, time
+from typing import NamedTuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BANDS = {"delta": (1, 4), "theta": (4, 8), "alpha": (8, 13),
+         "beta": (13, 30), "gamma": (30, 45)}
+
+class FeatureBlock(NamedTuple):
+    """Features of m windows over C channels and B bands."""
+    t:          np.ndarray   # (m,)      timestamp of each window's last sample
+    mean:       np.ndarray   # (m, C)
+    var:        np.ndarray   # (m, C)
+    band_power: np.ndarray   # (m, C, B)
+    entropy:    np.ndarray   # (m, C)    normalised spectral entropy, 0…1
+
+    def __len__(self):
+        return len(self.t)
+
+    def flat(self) -> np.ndarray:
+        """(m, C·(B+3)) feature matrix, e.g. as model input."""
+        m = len(self.t)
+        return np.concatenate([self.mean, self.var, self.entropy,
+                               np.log1p(self.band_power).reshape(m, -1)], axis=1)
+
+# ───────────────────────── windowing ────────────────────────────────────────
+class SlidingWindows:
+    """Cut a sample stream into windows of `window` samples every `hop`.
+
+    Samples are stored twice in a mirrored buffer, so every window completed
+    by a push is part of one contiguous (m, C, W) stride-trick view.
+    Subclasses extend `_store` / `_emit`; the base `_emit` returns that view
+    (valid until the next push) with each window's last timestamp.
+    """
+
+    def __init__(self, n_chan: int, window: int = 256, hop: int = 32):
+        self.n_chan, self.window, self.hop = n_chan, window, hop
+        self.cap = cap = 2 * window                 # room for window + a block
+        self.buf = np.zeros((2 * cap, n_chan), np.float32)   # mirrored halves
+        self.ts  = np.zeros(2 * cap, np.float64)
+        self.n = 0                                  # samples seen
+        self.next_end = window                      # end of the next window
+
+    def push(self, block: np.ndarray, ts=None) -> list:
+        """Add (k × channels) samples; return one `_emit` result per piece
+        of the block that finished at least one window."""
+        block = np.asarray(block, np.float32)
+        if ts is None:
+            ts = np.arange(self.n, self.n + len(block), dtype=np.float64)
+        ts = np.asarray(ts, np.float64)
+        step, out = self.cap - self.window, []
+        for i in range(0, len(block), step):        # keep each window in the buffer
+            piece = block[i:i + step]
+            idx = (self.n + np.arange(len(piece))) % self.cap
+            self._store(idx, piece, ts[i:i + step])
+            self.n += len(piece)
+            if self.next_end > self.n:
+                continue
+            ends   = np.arange(self.next_end, self.n + 1, self.hop)
+            self.next_end = int(ends[-1]) + self.hop
+            starts = ends - self.window
+            p0     = int(starts[0]) % self.cap
+            region = self.buf[p0:p0 + int(ends[-1] - starts[0])]
+            wins   = sliding_window_view(region, self.window, axis=0)[::self.hop]
+            out.append(self._emit(wins, ends, starts))
+        return out
+
+    def _store(self, idx, block, ts):
+        for arr, val in ((self.buf, block), (self.ts, ts)):
+            arr[idx] = val
+            arr[idx + self.cap] = val
+
+    def _emit(self, wins, ends, starts):
+        return wins, self.ts[(ends - 1) % self.cap]
+
+# ───────────────────────── extractor ────────────────────────────────────────
+class StreamingFeatures(SlidingWindows):
+    """Overlapping-window features over an unbounded sample stream."""
+
+    def __init__(self, n_chan: int, srate: float, window: int = 256,
+                 hop: int = 32, bands: dict = BANDS):
+        super().__init__(n_chan, window, hop)
+        self.band_names = list(bands)
+        self.cs  = np.zeros((2 * self.cap, n_chan), np.float64)   # prefix Σx
+        self.cs2 = np.zeros((2 * self.cap, n_chan), np.float64)   # prefix Σx²
+        self._sum  = np.zeros(n_chan, np.float64)
+        self._sum2 = np.zeros(n_chan, np.float64)
+
+        self.taper = np.hanning(window).astype(np.float32)
+        freqs = np.fft.rfftfreq(window, 1.0 / srate)
+        self.band_matrix = np.stack(
+            [(freqs >= lo) & (freqs < hi) for lo, hi in bands.values()],
+            axis=1).astype(np.float32)              # (F, B)
+
+    def push(self, block: np.ndarray, ts=None) -> FeatureBlock | None:
+        """Add (k × channels) samples; return features of finished windows."""
+        out = super().push(block, ts)
+        if not out:
+            return None
+        return out[0] if len(out) == 1 else FeatureBlock(
+            *(np.concatenate(parts) for parts in zip(*out)))
+
+    def _store(self, idx, block, ts):
+        super()._store(idx, block, ts)
+        c1 = self._sum  + np.cumsum(block, axis=0, dtype=np.float64)
+        c2 = self._sum2 + np.cumsum(np.square(block, dtype=np.float64), axis=0)
+        for arr, val in ((self.cs, c1), (self.cs2, c2)):
+            arr[idx] = val
+            arr[idx + self.cap] = val
+        self._sum, self._sum2 = c1[-1], c2[-1]
+
+    def _emit(self, wins, ends, starts):
+        spec  = np.fft.rfft(wins * self.taper, axis=-1)
+        power = spec.real ** 2 + spec.imag ** 2                 # (m, C, F)
+        bands = power @ self.band_matrix                        # (m, C, B)
+        p     = power / np.maximum(power.sum(axis=-1, keepdims=True), 1e-12)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ent = -np.where(p > 0, p * np.log(p), 0).sum(axis=-1)
+        ent /= np.log(power.shape[-1])
+
+        # mean / variance from prefix sums: O(1) per window and channel
+        cap = self.cap
+        e, s = (ends - 1) % cap, (starts - 1) % cap
+        first = starts == 0
+        s1 = self.cs[e]  - np.where(first[:, None], 0, self.cs[s])
+        s2 = self.cs2[e] - np.where(first[:, None], 0, self.cs2[s])
+        mean = s1 / self.window
+        var  = np.maximum(s2 / self.window - mean ** 2, 0)
+        return FeatureBlock(self.ts[e], mean.astype(np.float32),
+                            var.astype(np.float32), bands, ent.astype(np.float32))
+
+# ───────────────────────── pipeline stage ───────────────────────────────────
+class FeatureStage(threading.Thread):
+    """Read an Acquisition's ring and publish FeatureBlocks.
+
+    Results go to `out_q` (newest kept if the consumer is slow) and to
+    every callable in `listeners`.
+    """
+
+    def __init__(self, source, window: int = 256, hop: int = 32,
+                 out_q: queue.Queue | None = None, listeners=()):
+        super().__init__(daemon=True)
+        self.source, self.window, self.hop = source, window, hop
+        self.out_q = out_q if out_q is not None else queue.Queue(maxsize=64)
+        self.listeners = list(listeners)
+        self.stopflag = threading.Event()
+        self.busy_s = 0.0                           # time spent computing
+
+    def run(self):
+        cursor = self.source.subscribe()
+        fx = StreamingFeatures(self.source.n_chan, self.source.srate,
+                               self.window, self.hop)
+        while not self.stopflag.is_set():
+            block, ts = cursor.read(timeout=0.1)
+            if not len(block):
+                continue
+            t0  = time.perf_counter()
+            res = fx.push(block, ts)
+            self.busy_s += time.perf_counter() - t0
+            if res is None:
+                continue
+            if self.out_q.full():
+                try:
+                    self.out_q.get_nowait()
+                except queue.Empty:
+                    pass
+            self.out_q.put_nowait(res)
+            for fn in self.listeners:
+                fn(res)
+
+    def stop(self):
+        self.stopflag.set()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+def bench(n_chan: int, srate: float, window: int, hop: int, block: int,
+          seconds: float = 60.0) -> float:
+    """Process `seconds` of synthetic data; return the real-time factor."""
+    fx   = StreamingFeatures(n_chan, srate, window, hop)
+    rng  = np.random.default_rng(0)
+    data = rng.standard_normal((int(seconds * srate), n_chan)).astype(np.float32)
+    t0 = time.perf_counter()
+    for i in range(0, len(data), block):
+        fx.push(data[i:i + block])
+    return seconds / (time.perf_counter() - t0)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--bench", action="store_true", help="synthetic throughput test")
+    ap.add_argument("--channels", type=int, default=64)
+    ap.add_argument("--srate", type=float, default=256)
+    ap.add_argument("--window", type=int, default=256)
+    ap.add_argument("--hop", type=int, default=32)
+    ap.add_argument("--block", type=int, default=32, help="samples per push")
+    args = ap.parse_args()
+
+    if args.bench:
+        rt = bench(args.channels, args.srate, args.window, args.hop, args.block)
+        print(f"[INFO] {args.channels} ch @ {args.srate:g} Hz, window {args.window}, "
+              f"hop {args.hop}: {rt:.1f}× real time "
+              f"({100 / rt:.1f} % of one core)")
+    else:
+        from eeg_acquire import Acquisition
+        acq = Acquisition()
+        acq.start()
+        stage = FeatureStage(acq, args.window, args.hop)
+        stage.start()
+        while True:
+            fb = stage.out_q.get()
+            alpha = fb.band_power[-1, :, 2].mean()
+            print(f"[FEAT] t={fb.t[-1]:.3f}  mean alpha {alpha:.3g}  "
+                  f"entropy {fb.entropy[-1].mean():.3f}")
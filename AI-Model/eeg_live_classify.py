@@ -0,0 +1,209 @@
+"""
+eeg_live_classify.py – run a trained Keras model on the live EEG stream.
+Run:  python eeg_live_classify.py model.keras [--classes happy walking] [--hop 32]
+
+`LiveClassifier` reads the shared Acquisition ring, cuts it into the
+model's (window × channels) input every `hop` samples and classifies them in
+micro-batches through one compiled tf.function, traced once at start-up.
+Each step serves only the newest `max_batch` windows; older ones, and any
+window whose last sample is more than `max_age` s old, are dropped and
+counted, so a slow step never turns into a growing backlog.
+
+Predictions go to `out_q` as ("pred", {...}) and, stamped with the time of
+the window's last sample, to an LSL "Markers" stream (EEGPredictions).
+"""
+import argparse, collections, queue, sys, threading, time
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, IRREGULAR_RATE, local_clock
+from eeg_features import SlidingWindows
+
+MARKER_STREAM = "EEGPredictions"
+LATENCY_KEEP  = 2048    # recent predictions kept for the percentiles
+
+# ───────────────────────── model ────────────────────────────────────────────
+def compile_model(model_path: str):
+    """(infer, window, n_chan): a traced tf.function over (batch, W, C)."""
+    import tensorflow as tf
+    model = tf.keras.models.load_model(model_path, compile=False)
+    _, window, n_chan = model.input_shape
+
+    @tf.function(input_signature=[tf.TensorSpec((None, window, n_chan), tf.float32)],
+                 reduce_retracing=True)
+    def infer(x):
+        return model(x, training=False)
+
+    infer(tf.zeros((1, window, n_chan)))            # trace + warm up now
+    return (lambda x: infer(x).numpy()), window, n_chan
+
+def percentiles(values) -> tuple[float, float]:
+    """(p50, p99) in ms of latencies given in seconds."""
+    if not len(values):
+        return float("nan"), float("nan")
+    p50, p99 = np.percentile(np.asarray(values) * 1e3, (50, 99))
+    return float(p50), float(p99)
+
+# ───────────────────────── classifier stage ─────────────────────────────────
+class LiveClassifier(threading.Thread):
+    """Consume an Acquisition's ring and publish timestamped predictions.
+
+    `model` is a saved Keras model path, or an (infer, window, n_chan) tuple
+    as returned by compile_model().  Latency is measured from the read that
+    delivered a window's last sample ("arrival") and from that sample's LSL
+    timestamp ("sample"), both on the pylsl local clock.
+    """
+
+    def __init__(self, source, model, classes: list[str] | None = None,
+                 hop: int = 32, max_batch: int = 8, max_age: float = 0.5,
+                 out_q: queue.Queue | None = None,
+                 marker_stream: str | None = MARKER_STREAM):
+        super().__init__(daemon=True)
+        self.source, self.model, self.classes = source, model, classes
+        self.hop, self.max_batch, self.max_age = hop, max_batch, max_age
+        self.out_q = out_q if out_q is not None else queue.Queue(maxsize=64)
+        self.marker_stream = marker_stream
+        self.ready = threading.Event()
+        self.stopflag = threading.Event()
+        self.predictions = self.batches = 0
+        self.dropped_backlog = self.dropped_stale = 0
+        self.lat_arrival = collections.deque(maxlen=LATENCY_KEEP)
+        self.lat_sample  = collections.deque(maxlen=LATENCY_KEEP)
+        self.error: str | None = None
+
+    def label(self, k: int) -> str:
+        return self.classes[k] if self.classes and k < len(self.classes) else str(k)
+
+    def stats(self) -> dict:
+        a50, a99 = percentiles(self.lat_arrival)
+        s50, s99 = percentiles(self.lat_sample)
+        return {"predictions": self.predictions, "batches": self.batches,
+                "dropped_backlog": self.dropped_backlog,
+                "dropped_stale": self.dropped_stale,
+                "arrival_p50_ms": a50, "arrival_p99_ms": a99,
+                "sample_p50_ms": s50, "sample_p99_ms": s99}
+
+    def run(self):
+        try:
+            infer, self.window, n_in = (compile_model(self.model)
+                                        if isinstance(self.model, str) else self.model)
+        except Exception as e:
+            self.error = f"cannot load model: {e}"
+            print(f"[WARN] {self.error}", file=sys.stderr)
+            self.ready.set()
+            return
+        outlet = None
+        if self.marker_stream:
+            outlet = StreamOutlet(StreamInfo(self.marker_stream, "Markers", 1,
+                                             IRREGULAR_RATE, "string",
+                                             f"{self.marker_stream}-{id(self)}"))
+        cursor = self.source.subscribe()
+        n_chan = self.source.n_chan
+        windows = SlidingWindows(n_chan, self.window, self.hop)
+        # newest windows only: (W × C) copy, end timestamp, arrival time
+        pending = collections.deque(maxlen=self.max_batch)
+        keep = self.window + self.max_batch * self.hop   # samples worth reading
+        batch = np.zeros((self.max_batch, self.window, n_in), np.float32)
+        c = min(n_chan, n_in)
+        self.ready.set()
+
+        while not self.stopflag.is_set():
+            behind = cursor.available() - keep
+            if behind > self.hop:                   # skip what we could never serve
+                cursor.skip(behind)
+                self.dropped_backlog += behind // self.hop
+                windows = SlidingWindows(n_chan, self.window, self.hop)
+            block, ts = cursor.read(timeout=0.1)
+            if not len(block):
+                continue
+            arrived = local_clock()
+            for wins, t_end in windows.push(block, ts):
+                for w, t in zip(wins[-self.max_batch:], t_end[-self.max_batch:]):
+                    if len(pending) == pending.maxlen:
+                        self.dropped_backlog += 1
+                    pending.append((w[:c].T.copy(), t, arrived))
+                self.dropped_backlog += max(len(wins) - self.max_batch, 0)
+            if cursor.available():                  # finish draining first
+                continue
+
+            now = local_clock()
+            while pending and now - pending[0][1] > self.max_age:
+                pending.popleft()
+                self.dropped_stale += 1
+            if not pending:
+                continue
+            m = len(pending)
+            for j, (w, _, _) in enumerate(pending):
+                batch[j, :, :c] = w
+            probs = infer(batch[:m])
+            done = local_clock()
+
+            ks = np.argmax(probs, axis=-1)
+            for (_, t, arr), k in zip(pending, ks):
+                self.lat_arrival.append(done - arr)
+                self.lat_sample.append(done - t)
+                if outlet is not None:
+                    outlet.push_sample([self.label(int(k))], t)
+            t_last = pending[-1][1]
+            pending.clear()
+            self.predictions += m
+            self.batches += 1
+
+            pred = {"t": float(t_last), "label": self.label(int(ks[-1])),
+                    "prob": float(probs[-1][ks[-1]]),
+                    "latency_ms": float(done - t_last) * 1e3}
+            if self.out_q.full():                   # keep the newest
+                try:
+                    self.out_q.get_nowait()
+                except queue.Empty:
+                    pass
+            self.out_q.put_nowait(("pred", pred))
+
+    def stop(self):
+        self.stopflag.set()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("model", help="saved Keras model (input: batch × window × channels)")
+    ap.add_argument("--classes", nargs="+",
+                    help="label names in output order (default: catalog categories)")
+    ap.add_argument("--root", default="data", help="data root for default classes")
+    ap.add_argument("--hop", type=int, default=32, help="samples between windows")
+    ap.add_argument("--batch", type=int, default=8, help="max windows per step")
+    ap.add_argument("--max-age", type=float, default=0.5,
+                    help="drop windows older than this many seconds")
+    args = ap.parse_args()
+
+    classes = args.classes
+    if classes is None:
+        from eeg_catalog import Catalog
+        with Catalog(args.root) as cat:
+            cat.update()
+            classes = sorted(cat.categories())      # EEGDataset's label order
+
+    from eeg_acquire import Acquisition
+    acq = Acquisition()
+    acq.start()
+    clf = LiveClassifier(acq, args.model, classes, args.hop, args.batch,
+                         args.max_age, queue.Queue(maxsize=1))
+    clf.start()
+    clf.ready.wait()
+    if clf.error:
+        sys.exit(1)
+    try:
+        while True:
+            time.sleep(1.0)
+            try:
+                _, p = clf.out_q.get_nowait()
+                print(f"[PRED] t={p['t']:.3f}  {p['label']} ({p['prob']:.2f})")
+            except queue.Empty:
+                pass
+            s = clf.stats()
+            print(f"[INFO] latency arrival p50 {s['arrival_p50_ms']:.1f} / p99 "
+                  f"{s['arrival_p99_ms']:.1f} ms, sample p50 {s['sample_p50_ms']:.1f}"
+                  f" / p99 {s['sample_p99_ms']:.1f} ms; dropped "
+                  f"{s['dropped_backlog']} backlog, {s['dropped_stale']} stale")
+    except KeyboardInterrupt:
+        clf.stop()
+        clf.join()                                  # off the ring before it stops
+        acq.stop()
+        print(f"[DONE] {clf.stats()}")
@@ -0,0 +1,111 @@
+"""
+eeg_markers.py – in-session event markers stored next to a recording.
+Run:  python eeg_markers.py data/session/20240101_120000.npy   # list segments
+
+A recording x.npy may have a marker track x.markers.tsv with one line per
+event: the sample offset it applies from, its LSL timestamp and its label.
+Each marker opens a segment that runs until the next marker (or the end of
+the recording); an empty label closes the current segment without opening
+a new one.  One continuous capture can so hold many labelled trials.
+"""
+import argparse, csv, os, sys, threading
+from pylsl import StreamInlet, resolve_byprop, proc_clocksync
+from eeg_writer import markers_path
+
+END = ""                # label that only ends the current segment
+_HEADER = ("offset", "timestamp", "label")
+
+# ───────────────────────── marker track ─────────────────────────────────────
+class MarkerWriter:
+    """Append-only marker track; every line is fsync'd as it is written."""
+
+    def __init__(self, recording: str):
+        self.path = markers_path(recording)
+        self._f = open(self.path, "w", newline="")
+        self._w = csv.writer(self._f, delimiter="\t")
+        self._w.writerow(_HEADER)
+        self.count = 0
+
+    def add(self, offset: int, t: float, label: str):
+        self._w.writerow((offset, f"{t:.6f}", label))
+        self._f.flush()
+        os.fsync(self._f.fileno())                  # rare, and must survive a crash
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+def read_markers(recording: str) -> list[tuple[int, float, str]]:
+    """[(offset, timestamp, label)] of a recording, [] without a track."""
+    try:
+        with open(markers_path(recording), newline="") as f:
+            rows = list(csv.reader(f, delimiter="\t"))[1:]
+    except FileNotFoundError:
+        return []
+    return sorted((int(o), float(t), label) for o, t, label in rows)
+
+def segments(markers, n_samples: int) -> list[tuple[str, int, int]]:
+    """[(label, start, stop)] sample ranges the markers delimit."""
+    out = []
+    for i, (offset, _, label) in enumerate(markers):
+        stop = markers[i + 1][0] if i + 1 < len(markers) else n_samples
+        stop = min(stop, n_samples)
+        if label != END and stop > offset:
+            out.append((label, offset, stop))
+    return out
+
+# ───────────────────────── LSL marker input ─────────────────────────────────
+class MarkerListener(threading.Thread):
+    """Forward every sample of an LSL "Markers" stream to `callback(label, t)`.
+
+    Timestamps are clock-synced, so they compare directly with the EEG
+    timestamps of an Acquisition.  Streams named in `ignore` (e.g. our own
+    prediction outlet) are never picked.
+    """
+
+    def __init__(self, callback, name: str | None = None,
+                 ignore: tuple = ("EEGPredictions",)):
+        super().__init__(daemon=True)
+        self.callback, self.stream_name, self.ignore = callback, name, ignore
+        self.info = None
+        self.stopflag = threading.Event()
+
+    def _resolve(self):
+        while not self.stopflag.is_set():
+            for info in resolve_byprop("type", "Markers", minimum=1, timeout=2):
+                if (self.stream_name is None or info.name() == self.stream_name) \
+                        and info.name() not in self.ignore:
+                    return info
+        return None
+
+    def run(self):
+        self.info = self._resolve()
+        if self.info is None:
+            return
+        inlet = StreamInlet(self.info, processing_flags=proc_clocksync)
+        print(f"[INFO] Listening for markers on {self.info.name()}")
+        while not self.stopflag.is_set():
+            sample, t = inlet.pull_sample(timeout=0.2)
+            if sample:
+                self.callback(str(sample[0]), t)
+        inlet.close_stream()
+
+    def stop(self):
+        self.stopflag.set()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("recordings", nargs="+")
+    args = ap.parse_args()
+
+    from eeg_dataset import open_recording
+    for path in args.recordings:
+        marks = read_markers(path)
+        if not marks:
+            print(f"[WARN] {path}: no markers", file=sys.stderr)
+            continue
+        n = len(open_recording(path))
+        print(f"{path}: {len(marks)} markers, {n} samples")
+        for label, a, b in segments(marks, n):
+            print(f"  {label:>16}: samples {a}–{b} ({b - a})")
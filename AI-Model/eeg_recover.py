@@ -0,0 +1,108 @@
+"""
+eeg_recover.py – rebuild recordings left unfinished by a crashed capture.
+Run:  python eeg_recover.py data                 # everything with an x.ckpt.json
+      python eeg_recover.py data/walking/20240101_120000.npy
+
+CaptureThread keeps x.ckpt.json next to a recording until it closes it, so
+any such file marks a capture that died.  Recovery keeps every complete row
+on disk (at least what the last checkpoint made durable), cuts the data and
+its .ts.npy sidecar to the same length, rewrites the .npy header or the
+.eegz index, re-indexes the catalog and removes the checkpoint header.
+"""
+import argparse, glob, json, os, sys
+import numpy as np
+from eeg_writer import HEADER_LEN, npy_header, timestamps_path, checkpoint_path
+from eeg_compress import EegzReader, repair_eegz
+from eeg_catalog import Catalog
+
+# ───────────────────────── .npy streams ─────────────────────────────────────
+def _npy_layout(path: str) -> tuple[int, tuple, np.dtype]:
+    """(complete rows on disk, shape, dtype) of a streamed .npy file."""
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) \
+               else np.lib.format.read_array_header_2_0
+        shape, _, dtype = read(f)
+        if f.tell() != HEADER_LEN:
+            raise ValueError(f"{path}: not written by NpyStreamWriter")
+        size = os.fstat(f.fileno()).st_size
+    row = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+    return (size - HEADER_LEN) // row, shape, dtype
+
+def _cut_npy(path: str, n: int):
+    _, shape, dtype = _npy_layout(path)
+    row = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+    with open(path, "r+b") as f:
+        f.write(npy_header((n,) + tuple(shape[1:]), dtype))
+        f.truncate(HEADER_LEN + n * row)
+        f.flush()
+        os.fsync(f.fileno())
+
+# ───────────────────────── recovery ─────────────────────────────────────────
+def unfinished(root: str) -> list[str]:
+    """Recordings below `root` that still have a checkpoint header."""
+    out = []
+    for ckpt in sorted(glob.glob(os.path.join(root, "**", "*.ckpt.json"),
+                                 recursive=True)):
+        stem = ckpt[:-len(".ckpt.json")]
+        out += [stem + ext for ext in (".npy", ".eegz") if os.path.exists(stem + ext)]
+    return out
+
+def recover(path: str) -> dict:
+    """Make one recording and its timestamps consistent; return a summary."""
+    ckpt = checkpoint_path(path)
+    durable = None
+    if os.path.exists(ckpt):
+        with open(ckpt) as f:
+            durable = json.load(f)["rows"].get(os.path.basename(path))
+
+    tpath = timestamps_path(path)
+    ts_rows = _npy_layout(tpath)[0] if os.path.exists(tpath) else None
+    if path.endswith(".eegz"):
+        with EegzReader(path) as r:                 # scans chunks without footer
+            rows = r.n_rows
+        n = repair_eegz(path, rows if ts_rows is None else min(rows, ts_rows))
+    else:
+        rows = _npy_layout(path)[0]
+        n = rows if ts_rows is None else min(rows, ts_rows)
+        _cut_npy(path, n)
+    if ts_rows is not None:
+        _cut_npy(tpath, n)
+
+    duration = None
+    if ts_rows and n > 1:
+        ts = np.load(tpath, mmap_mode="r")
+        duration = float(ts[n - 1] - ts[0])
+    if os.path.exists(ckpt):
+        os.remove(ckpt)
+    return {"path": path, "samples": n, "checkpointed": durable,
+            "dropped": rows - n, "duration_s": duration}
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("paths", nargs="*", default=["data"],
+                    help="recordings, or folders to search for unfinished ones")
+    args = ap.parse_args()
+
+    todo = []
+    for p in args.paths:
+        todo += unfinished(p) if os.path.isdir(p) else [p]
+    if not todo:
+        print("[INFO] nothing to recover")
+    for path in todo:
+        try:
+            rep = recover(path)
+        except Exception as e:
+            print(f"[WARN] {path}: {e}", file=sys.stderr)
+            continue
+        dur = f", {rep['duration_s']:.1f} s" if rep["duration_s"] else ""
+        print(f"[DONE] {path}: {rep['samples']} samples{dur} "
+              f"(checkpoint had {rep['checkpointed']}, dropped {rep['dropped']} "
+              f"rows without timestamps)")
+        root = os.path.dirname(os.path.dirname(path)) or "."
+        try:
+            with Catalog(root) as cat:
+                cat.add(path)
+        except Exception as e:
+            print(f"[WARN] could not update catalog: {e}", file=sys.stderr)
@@ -0,0 +1,152 @@
+"""
+eeg_simulate.py – stand-in LSL EEG stream: synthetic signals or replayed recordings.
+Run:  python eeg_simulate.py --srate 256 --channels 8 --chunk 32
+      python eeg_simulate.py --replay data/happy --loop
+
+Publishes an LSL stream of type "EEG", so the capture GUI, eeg_view and
+every Acquisition consumer run without a headset.  Chunks are paced on
+pylsl.local_clock and stamped with their scheduled sample times, so a
+receiver's latency is measured against when the samples "happened".
+"""
+import argparse, glob, os, threading, time
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, local_clock
+from eeg_compress import load_recording, is_recording
+
+LEAK = 0.995            # pole of the background noise filter
+
+# ───────────────────────── signal sources ───────────────────────────────────
+class Synthetic:
+    """Per-channel alpha/beta rhythms, 50 Hz hum and 1/f-like noise in µV."""
+
+    def __init__(self, n_chan: int, srate: float, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.n_chan, self.srate = n_chan, srate
+        self.freqs = np.array([10.0, 20.0, 50.0])                # alpha, beta, hum
+        self.amps  = rng.uniform((10, 3, 1), (30, 8, 3), (n_chan, 3)).astype(np.float32)
+        self.phase = rng.uniform(0, 2 * np.pi, (n_chan, 3))
+        self.rng   = rng
+        self.drift = np.zeros(n_chan)
+        self.n = 0
+
+    def read(self, k: int) -> np.ndarray:
+        t   = (self.n + np.arange(k)) / self.srate
+        arg = 2 * np.pi * t[:, None, None] * self.freqs + self.phase     # (k, C, 3)
+        x   = (np.sin(arg) * self.amps).sum(axis=2, dtype=np.float32)
+        # leaky random walk, y[i] = a·y[i-1] + e[i], ≈ pink-ish background
+        e = self.rng.standard_normal((k, self.n_chan)) * 2
+        g = LEAK ** np.arange(1, k + 1)[:, None]
+        walk = g * (self.drift + np.cumsum(e / g, axis=0))
+        self.drift = walk[-1]
+        self.n += k
+        return x + walk.astype(np.float32)
+
+class Replay:
+    """Samples of saved recordings, in order, optionally looping forever."""
+
+    def __init__(self, paths: list[str], n_chan: int | None = None,
+                 loop: bool = False):
+        self.paths, self.loop = paths, loop
+        self.recs  = [load_recording(p) for p in paths]
+        self.recs  = [r for r in self.recs if r.ndim == 2 and len(r)]
+        if not self.recs:
+            raise ValueError("no 2-D recordings to replay")
+        self.n_chan = n_chan or self.recs[0].shape[1]
+        self.i = self.pos = 0
+
+    def read(self, k: int) -> np.ndarray | None:
+        out, got = np.zeros((k, self.n_chan), np.float32), 0
+        while got < k:
+            if self.i == len(self.recs):
+                if not self.loop:
+                    return out[:got] if got else None
+                self.i = 0
+            rec = self.recs[self.i]
+            part = rec[self.pos:self.pos + k - got]
+            c = min(self.n_chan, rec.shape[1])
+            out[got:got + len(part), :c] = part[:, :c]
+            got += len(part)
+            self.pos += len(part)
+            if self.pos >= len(rec):
+                self.i, self.pos = self.i + 1, 0
+        return out
+
+def replay_paths(items: list[str]) -> list[str]:
+    """Expand folders to the recordings below them, sorted."""
+    out = []
+    for item in items:
+        if os.path.isdir(item):
+            out += sorted(f for f in glob.glob(os.path.join(item, "**", "*"),
+                                               recursive=True) if is_recording(f))
+        else:
+            out.append(item)
+    return out
+
+# ───────────────────────── outlet thread ────────────────────────────────────
+class SimulatedOutlet(threading.Thread):
+    """Push `source.read(chunk)` blocks to an LSL outlet in real time."""
+
+    def __init__(self, source, srate: float, chunk: int = 32,
+                 name: str = "SimEEG", source_id: str | None = None):
+        super().__init__(daemon=True)
+        self.source, self.srate, self.chunk = source, srate, chunk
+        self.info = StreamInfo(name, "EEG", source.n_chan, srate, "float32",
+                               source_id or f"{name}-{os.getpid()}")
+        self.outlet = StreamOutlet(self.info, chunk_size=chunk)
+        self.stopflag = threading.Event()
+        self.sent = 0                               # samples pushed
+        self.late = 0                               # chunks pushed > 1 chunk late
+        self.t0: float | None = None
+
+    def run(self):
+        self.t0 = t0 = local_clock()
+        period = self.chunk / self.srate
+        while not self.stopflag.is_set():
+            due  = t0 + (self.sent + self.chunk) / self.srate
+            wait = due - local_clock()
+            if wait > 0:
+                time.sleep(wait)
+            elif wait < -period:
+                self.late += 1
+            block = self.source.read(self.chunk)
+            if block is None:
+                break
+            last = t0 + (self.sent + len(block) - 1) / self.srate
+            self.outlet.push_chunk(np.ascontiguousarray(block, np.float32), last)
+            self.sent += len(block)
+
+    def stop(self):
+        self.stopflag.set()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--srate", type=float, default=256)
+    ap.add_argument("--channels", type=int, help="default 8, or the "
+                    "recordings' width with --replay")
+    ap.add_argument("--chunk", type=int, default=32, help="samples per push")
+    ap.add_argument("--replay", nargs="+", metavar="PATH",
+                    help="recordings or folders to play back instead of synthetic data")
+    ap.add_argument("--loop", action="store_true", help="restart the replay at the end")
+    ap.add_argument("--name", default="SimEEG")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.replay:
+        src = Replay(replay_paths(args.replay), args.channels, args.loop)
+        what = f"replaying {len(src.recs)} recording(s)"
+    else:
+        src = Synthetic(args.channels or 8, args.srate, args.seed)
+        what = "synthetic"
+    sim = SimulatedOutlet(src, args.srate, args.chunk, args.name)
+    sim.start()
+    print(f"[INFO] {args.name}: {src.n_chan} ch @ {args.srate:g} Hz, "
+          f"chunks of {args.chunk}, {what} – Ctrl+C to stop")
+    try:
+        while sim.is_alive():
+            sim.join(timeout=5)
+            if sim.is_alive():
+                print(f"[INFO] {sim.sent} samples sent, {sim.late} late chunks")
+    except KeyboardInterrupt:
+        sim.stop()
+    print(f"[DONE] {sim.sent} samples sent")
@@ -0,0 +1,114 @@
+"""
+eeg_telemetry.py – rolling counters of a running capture, for the GUI, stdout and CSV.
+Run:  python eeg_telemetry.py telemetry.csv      # summarise a logged session
+
+CaptureThread keeps one `Telemetry` per recording and merges its snapshot
+into every ("stats", …) message: the sample rate over the last few seconds,
+samples zero-padded or truncated to FFT_MAX_HZ columns, how old the newest
+sample is when it reaches the writer, bytes on disk, blocks waiting for the
+checkpoint thread and samples waiting behind the reader.  `TelemetryLog`
+appends the snapshots to a CSV file for later profiling.
+"""
+import argparse, collections, csv, os, sys, time
+import numpy as np
+from pylsl import local_clock
+
+RATE_WINDOW  = 5.0      # s of history behind the rolling sample rate
+LATENCY_KEEP = 512      # recent writes kept for the latency percentiles
+
+FIELDS = ("time", "source", "samples", "rate", "rate_avg", "padded", "truncated",
+          "latency_p50_ms", "latency_max_ms", "bytes", "writer_backlog", "queue",
+          "overflows", "lost")
+
+# ───────────────────────── counters ─────────────────────────────────────────
+class Telemetry:
+    """Counters updated by the capture thread, read as one snapshot dict."""
+
+    def __init__(self, n_cols: int, window: float = RATE_WINDOW):
+        self.n_cols, self.window = n_cols, window
+        self.t0 = time.perf_counter()
+        self.samples = self.padded = self.truncated = 0
+        self.latency = collections.deque(maxlen=LATENCY_KEEP)
+        self._marks  = collections.deque([(self.t0, 0)])   # (time, samples)
+
+    def record(self, n: int, width: int, t_newest: float):
+        """`n` samples of `width` values, the newest stamped `t_newest`
+        (local clock), were handed to the writer."""
+        self.samples += n
+        if width < self.n_cols:
+            self.padded += n
+        elif width > self.n_cols:
+            self.truncated += n
+        self.latency.append(local_clock() - t_newest)
+
+    def rate(self) -> float:
+        """Samples/s over the last `window` seconds."""
+        now = time.perf_counter()
+        self._marks.append((now, self.samples))
+        while len(self._marks) > 2 and now - self._marks[1][0] >= self.window:
+            self._marks.popleft()
+        t, n = self._marks[0]
+        return (self.samples - n) / (now - t) if now > t else 0.0
+
+    def snapshot(self, writer=None, flusher=None, queue_depth: int = 0) -> dict:
+        lat = np.asarray(self.latency) * 1e3
+        dt  = time.perf_counter() - self.t0
+        return {"samples": self.samples, "rate": self.rate(),
+                "rate_avg": self.samples / dt if dt > 0 else 0.0,
+                "padded": self.padded, "truncated": self.truncated,
+                "latency_p50_ms": float(np.median(lat)) if len(lat) else float("nan"),
+                "latency_max_ms": float(lat.max()) if len(lat) else float("nan"),
+                "bytes": writer.bytes_written if writer is not None else 0,
+                "writer_backlog": flusher.backlog if flusher is not None else 0,
+                "queue": queue_depth}
+
+def format_telemetry(s: dict) -> str:
+    """One line for a status bar or stdout."""
+    return (f"{s['rate']:.0f} samples/s, {s['padded']} padded, "
+            f"{s['truncated']} truncated, latency {s['latency_p50_ms']:.1f}/"
+            f"{s['latency_max_ms']:.1f} ms, {s['bytes'] / 2**20:.1f} MB, "
+            f"writer backlog {s['writer_backlog']}, queue {s['queue']}")
+
+# ───────────────────────── CSV log ──────────────────────────────────────────
+class TelemetryLog:
+    """Append snapshots to a CSV file, one row per stats message."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.path = path
+        self._f = open(path, "a", newline="")
+        self._w = csv.DictWriter(self._f, FIELDS, restval=0, extrasaction="ignore")
+        if new:
+            self._w.writeheader()
+
+    def write(self, stats: dict, source: str = ""):
+        row = {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+        self._w.writerow({**row, "time": f"{time.time():.3f}", "source": source})
+        self._f.flush()
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("csv", help="log written with TELEMETRY_CSV or --telemetry-csv")
+    args = ap.parse_args()
+
+    with open(args.csv, newline="") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        sys.exit("[WARN] empty log")
+    by_source = collections.defaultdict(list)
+    for r in rows:
+        by_source[r["source"]].append(r)
+    for source, rs in by_source.items():
+        col = lambda k: np.array([float(r[k]) for r in rs])
+        rate, lat = col("rate"), col("latency_max_ms")
+        print(f"{source or '(capture)'}: {len(rs)} rows, rate min/median "
+              f"{rate.min():.1f}/{np.median(rate):.1f} samples/s, worst latency "
+              f"{np.nanmax(lat):.1f} ms, max writer backlog "
+              f"{int(col('writer_backlog').max())}, max queue {int(col('queue').max())}, "
+              f"{int(col('padded').max())} padded, {int(col('lost').max())} lost")
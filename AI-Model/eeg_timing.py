@@ -0,0 +1,85 @@
+"""
+eeg_timing.py – effective rate, gaps and jitter of saved recordings.
+Run:  python eeg_timing.py data/happy [more files or folders] [--srate 256]
+
+Works on the x.ts.npy timestamp sidecar written next to each x.npy.
+"""
+import argparse, glob, os, sys
+import numpy as np
+from eeg_writer import timestamps_path, is_sidecar
+
+GAP_FACTOR = 1.5    # an interval this many sample periods long is a gap
+
+# ───────────────────────── analysis ─────────────────────────────────────────
+def timing_report(ts, srate: float | None = None,
+                  gap_factor: float = GAP_FACTOR) -> dict:
+    """Summarise one timestamp vector.
+
+    `srate` is the nominal rate; without it the median interval is used.
+    Jitter is measured against a least-squares clock line through the
+    stamps, with samples lost in gaps kept in the index so gaps don't bend it.
+    """
+    ts = np.asarray(ts, np.float64)
+    n  = len(ts)
+    if n < 2:
+        return {"samples": n}
+    dt       = np.diff(ts)
+    period   = 1.0 / srate if srate else float(np.median(dt))
+    duration = float(ts[-1] - ts[0])
+
+    gaps    = dt > gap_factor * period
+    steps   = np.where(gaps, np.rint(dt / period), 1.0)
+    missing = int(steps.sum() - len(steps))
+
+    idx = np.concatenate(([0.0], np.cumsum(steps)))
+    t   = ts - ts[0]
+    slope, icpt = np.polyfit(idx, t, 1)
+    resid = t - (slope * idx + icpt)
+
+    return {
+        "samples":         n,
+        "duration_s":      duration,
+        "nominal_rate":    1.0 / period,
+        "effective_rate":  (n - 1) / duration if duration > 0 else 0.0,
+        "clock_rate":      float(1.0 / slope) if slope > 0 else 0.0,
+        "gaps":            int(gaps.sum()),
+        "missing_samples": missing,
+        "loss_pct":        100.0 * missing / (n + missing),
+        "max_gap_s":       float(dt.max()),
+        "non_monotonic":   int((dt <= 0).sum()),
+        "jitter_std_ms":   float(resid.std() * 1e3),
+        "jitter_p99_ms":   float(np.percentile(np.abs(resid), 99) * 1e3),
+    }
+
+def format_report(rep: dict) -> str:
+    if rep["samples"] < 2:
+        return f"{rep['samples']} samples – too short to analyse"
+    return (f"{rep['samples']} samples / {rep['duration_s']:.1f} s, "
+            f"{rep['effective_rate']:.2f} Hz effective "
+            f"(nominal {rep['nominal_rate']:.2f}), "
+            f"{rep['gaps']} gaps, {rep['missing_samples']} missing "
+            f"({rep['loss_pct']:.2f} %), "
+            f"jitter {rep['jitter_std_ms']:.2f} ms std / "
+            f"{rep['jitter_p99_ms']:.2f} ms p99")
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+def _recordings(paths):
+    for p in paths:
+        files = sorted(glob.glob(os.path.join(p, "**", "*.npy"), recursive=True)) \
+                if os.path.isdir(p) else [p]
+        yield from (f for f in files if not is_sidecar(f))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("paths", nargs="+", help="recordings or folders of them")
+    ap.add_argument("--srate", type=float, help="nominal sampling rate (Hz)")
+    args = ap.parse_args()
+
+    for fpath in _recordings(args.paths):
+        tpath = timestamps_path(fpath)
+        if not os.path.exists(tpath):
+            print(f"[WARN] {fpath}: no timestamps (recorded before sidecars)",
+                  file=sys.stderr)
+            continue
+        rep = timing_report(np.load(tpath, mmap_mode="r"), args.srate)
+        print(f"{fpath}: {format_report(rep)}")
@@ -1,93 +1,608 @@
 """
 eeg_view.py – stand-alone LSL EEG viewer with diagnostics.
-Run:  python eeg_view.py
+Run:  python eeg_view.py [--waterfall [--window 10] [--db]]
+      python eeg_view.py --review data/happy/20240101_120000.npy [--speed 10]
+
+"lines" draws one trace per channel.  "waterfall" draws the stream as one
+image, channels (FFT bins) up and time across, and suits the 60-bin
+spectra the capture stores; its frame cost depends on the image size only.
+
+--review opens a saved recording instead (memory-mapped; .eegz decodes only
+the chunks on screen): slider or ←/→ to scrub, scroll wheel to zoom, space
+to play at 1×–50× (+/−).  Each pixel column shows the min/max of the samples
+it covers, read from a small summary pyramid, so hours render at once.  The
+pyramid is saved beside the recording (x.minmax.npz) and reused until the
+recording's size or mtime changes, so reopening skips the full pass.
 """
 
 # ── Force a GUI backend before importing pyplot ─────────────────────────────
 import matplotlib
-matplotlib.use("TkAgg")            # change to "QtAgg" for PyQt if you like
+matplotlib.use("TkAgg", force=False)   # "QtAgg" for PyQt; no-op when headless
 
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
-from pylsl import StreamInlet, resolve_byprop
+from matplotlib.widgets import Slider
+from matplotlib.collections import PolyCollection
+from matplotlib.patches import Rectangle
+from matplotlib.ticker import MaxNLocator
+from matplotlib.transforms import Bbox, IdentityTransform
 import numpy as np
-from collections import deque
-import time, sys
-
-# ───────────────────────── helper ───────────────────────────────────────────
-def wait_for_eeg(timeout_per_try=5, retry_pause=2):
-    """Block until an EEG LSL stream appears, then return (inlet, info)."""
-    attempt = 0
-    while True:
-        streams = resolve_byprop("type", "EEG", timeout=timeout_per_try)
-        if streams:
-            info = streams[0]
-            print(f"[INFO] Connected to EEG stream: {info.name()} "
-                  f"({info.channel_count()} ch, {info.nominal_srate()} Hz)")
-            return StreamInlet(info), info
-        attempt += 1
-        print(f"[WARN] No EEG stream (attempt {attempt}), retrying…", file=sys.stderr)
-        time.sleep(retry_pause)
+import argparse, json, os, time, sys
+from eeg_ingest import ChunkReader
+from eeg_acquire import wait_for_eeg, RingSource
+from eeg_compress import EegzReader
+from eeg_markers import read_markers, END
+from eeg_writer import timestamps_path, summary_path
 
-# ───────────────────────── live viewer ──────────────────────────────────────
-def start_live_viewer(window_s: float = 1.0):
+# ───────────────────────── ring buffer ──────────────────────────────────────
+class ChannelRing:
+    """Fixed channels × samples circular buffer with a single write index."""
+
+    def __init__(self, n_chan: int, n_samp: int):
+        self.data = np.full((n_chan, n_samp), np.nan, np.float32)
+        self.idx  = 0                               # next column to write
+
+    def extend(self, block: np.ndarray):
+        """Write a (samples × channels) block, wrapping at the end."""
+        n = self.data.shape[1]
+        if len(block) >= n:
+            block = block[-n:]
+        k   = len(block)
+        end = self.idx + k
+        if end <= n:
+            self.data[:, self.idx:end] = block.T
+        else:
+            split = n - self.idx
+            self.data[:, self.idx:] = block[:split].T
+            self.data[:, :end - n]  = block[split:].T
+        self.idx = end % n
+
+# ───────────────────────── autoscale ────────────────────────────────────────
+class RangeTracker:
+    """Per-channel y-limits that only change when the data range does.
+
+    Limits grow as soon as a new block leaves them, with `headroom` of the
+    new span added on each side (so ×2 by default), and shrink, to `margin`
+    either side, only when the whole window uses less than `shrink_below`
+    of the current span.  The gap between the two is the hysteresis that
+    keeps an ordinary signal from rescaling every few frames.
+    """
+
+    def __init__(self, n_chan: int, lo: float = -100, hi: float = 100,
+                 margin: float = 0.25, shrink_below: float = 0.4,
+                 min_span: float = 1.0, headroom: float = 0.5):
+        self.lo = np.full(n_chan, lo, np.float64)
+        self.hi = np.full(n_chan, hi, np.float64)
+        self.margin, self.shrink_below = margin, shrink_below
+        self.min_span, self.headroom = min_span, headroom
+
+    def _set(self, mask, lo, hi, pad_frac: float):
+        span = np.maximum(hi - lo, self.min_span)
+        pad  = span * pad_frac + (span - (hi - lo)) / 2
+        self.lo[mask], self.hi[mask] = lo[mask] - pad[mask], hi[mask] + pad[mask]
+
+    def grow(self, block: np.ndarray) -> np.ndarray:
+        """Widen limits to cover a (samples × channels) block; return changed mask."""
+        lo, hi = block.min(axis=0), block.max(axis=0)
+        mask = (lo < self.lo) | (hi > self.hi)
+        if mask.any():
+            self._set(mask, np.minimum(lo, self.lo), np.maximum(hi, self.hi),
+                      self.headroom)
+        return mask
+
+    def shrink(self, data: np.ndarray) -> np.ndarray:
+        """Tighten limits to a (channels × samples) window; return changed mask."""
+        with np.errstate(all="ignore"):
+            lo, hi = np.nanmin(data, axis=1), np.nanmax(data, axis=1)
+        want = np.maximum(hi - lo, self.min_span) * (1 + 2 * self.margin)
+        mask = (want < self.shrink_below * (self.hi - self.lo)) & np.isfinite(lo)
+        if mask.any():
+            self._set(mask, lo, hi, self.margin)
+        return mask
+
+VIEWER_ROWS    = 16     # axes stacked per column before the viewer adds one
+YLIM_EVERY     = 0.5    # s between y-limit repaints; traces may clip meanwhile
+WATERFALL_COLS = 600    # image columns across the waterfall window
+RESCALE_EVERY  = 1.0    # s between waterfall colour-limit checks
+REVIEW_BASE    = 64     # samples per min/max bin at the finest summary level
+REVIEW_SPEEDS  = (1, 2, 5, 10, 20, 50)
+
+# ───────────────────────── shared helpers ───────────────────────────────────
+def open_source(window_s: float, source=None):
+    """(pull, n_chan, srate) from an Acquisition, or from an inlet of our own."""
+    if source is not None:
+        pull = source.subscribe().read              # waits for the stream
+        return pull, source.n_chan, source.srate
     inlet, info = wait_for_eeg()
     n_chan = info.channel_count()
     srate  = info.nominal_srate() or 250
+    pull   = ChunkReader(inlet, n_chan, max_samples=int(window_s * srate)).pull
+    return pull, n_chan, srate
+
+def frame_monitor(fps: float):
+    """tick() once per drawn frame; warns when we fall behind the target rate."""
+    frame_s, frames, last_t, slow_acc = 1.0 / fps, 0, time.perf_counter(), 0.0
+    def tick():
+        nonlocal frames, last_t, slow_acc
+        frames += 1
+        now = time.perf_counter()
+        slow_acc = 0.9 * slow_acc + 0.1 * (now - last_t)
+        last_t = now
+        if frames % max(1, round(5 * fps)) == 0 and slow_acc > 1.5 * frame_s:
+            print(f"[WARN] viewer at {1 / slow_acc:.1f} fps "
+                  f"(target {fps:.0f})", file=sys.stderr)
+        return frames
+    return tick
+
+# ───────────────────────── live viewer ──────────────────────────────────────
+def build_viewer(window_s: float = 1.0, fps: float = 25, source=None):
+    """Create the viewer figure; return (fig, update) where update(frame)
+    pulls new samples and returns the artists to blit.
+
+    With `source` (an eeg_acquire.Acquisition) the viewer reads from the
+    shared ring instead of opening an inlet of its own.
+    """
+    pull, n_chan, srate = open_source(window_s, source)
     buf_len = int(window_s * srate)
+    gap     = max(1, buf_len // 50)                 # blank columns ahead of the sweep
 
-    buffers = [deque(maxlen=buf_len) for _ in range(n_chan)]
-    times   = deque(maxlen=buf_len)
-    start_t = None
+    ring   = ChannelRing(n_chan, buf_len)
+    ranges = RangeTracker(n_chan)
+    t      = np.arange(buf_len) / srate             # sweep display: fixed x axis
 
     plt.style.use("seaborn-v0_8-darkgrid")
-    fig, axes = plt.subplots(n_chan, 1, sharex=True,
-                             figsize=(10, 2 * n_chan),
-                             constrained_layout=True)
+    n_cols = -(-n_chan // VIEWER_ROWS)              # channels fill columns of axes
+    n_rows = -(-n_chan // n_cols)
+    dense  = n_rows > 8                             # constrained layout gives up here
+    fig, grid = plt.subplots(n_rows, n_cols, squeeze=False,
+                             figsize=(min(10 + 4 * (n_cols - 1), 18),
+                                      min(2 * n_rows, 12)),
+                             constrained_layout=not dense)
+    if dense:
+        fig.subplots_adjust(left=0.03 + 0.09 / n_cols, right=0.99, top=0.99,
+                            bottom=0.05, hspace=0.15, wspace=0.35)
+    axes = grid.flatten(order="F")[:n_chan]
+    for ax in grid.flatten(order="F")[n_chan:]:
+        ax.set_visible(False)
     lines = []
     for ch, ax in enumerate(axes):
-        line, = ax.plot([], [], lw=1)
-        ax.set_ylabel(f"Ch {ch+1}")
-        ax.set_ylim(-100, 100)
+        line, = ax.plot(t, ring.data[ch], lw=1, animated=True)
+        ax.set_ylabel(f"Ch {ch+1}", fontsize=7 if dense else None)
+        # x is fixed, so no sharex: shared axes make every blit walk all siblings
+        ax.set_xlim(0, window_s)
+        ax.set_ylim(ranges.lo[ch], ranges.hi[ch])
+        ax.xaxis.set_tick_params(labelbottom=False)
+        if dense:
+            ax.yaxis.set_major_locator(MaxNLocator(3))
+            ax.tick_params(labelsize=6)
         lines.append(line)
-    axes[-1].set_xlabel("Time (s)")
+    for j in range(n_cols):                         # x labels under each column
+        bottom = axes[min(j * n_rows + n_rows, n_chan) - 1]
+        bottom.xaxis.set_tick_params(labelbottom=True)
+        bottom.set_xlabel("Time (s)")
 
-    print("[INFO] Opening EEG live viewer window…")
+    def strip(ch: int) -> Bbox:
+        """Display-space band of one axes: its tick labels and y label, up to
+        halfway to the neighbouring axes, so repainting it leaves them alone."""
+        i, j = ch % n_rows, ch // n_rows
+        box = axes[ch].bbox
+        x0  = grid[i, j - 1].bbox.x1 + 1 if j else 0
+        x1  = box.x1 + 1 if j < n_cols - 1 else fig.bbox.x1
+        y1  = (box.y1 + grid[i - 1, j].bbox.y0) / 2 if i else fig.bbox.y1
+        y0  = ((box.y0 + grid[i + 1, j].bbox.y1) / 2
+               if i < n_rows - 1 and ch + 1 < n_chan else 0)
+        return Bbox.from_extents(x0, y0, x1, y1)
+
+    backdrop = Rectangle((0, 0), 1, 1, transform=IdentityTransform(),
+                         facecolor=fig.get_facecolor(), edgecolor="none")
+    backdrop.set_figure(fig)
+
+    def redraw(chans):
+        """New y-limits for `chans`, repainting only their strips.  The lines
+        are animated, so what is painted is each axes' blit background, and
+        FuncAnimation re-caches it when it sees the view has changed."""
+        renderer = fig.canvas.get_renderer()
+        for ch in chans:
+            axes[ch].set_ylim(ranges.lo[ch], ranges.hi[ch])
+            box = strip(ch)
+            backdrop.set_bounds(box.x0, box.y0, box.width, box.height)
+            backdrop.draw(renderer)
+            axes[ch].draw(renderer)
+            fig.canvas.blit(box)
+
+    tick = frame_monitor(fps)
+    pending, last_rescale = np.zeros(n_chan, bool), -np.inf
 
     # ── animation callback ─────────────────────────────────────────────────
     def update(_):
-        nonlocal start_t
-        new_pts = 0
-        for _ in range(10):                         # grab up to 10 samples
-            sample, ts = inlet.pull_sample(timeout=0.1)
-            if sample is None:
+        nonlocal pending, last_rescale
+        got, changed = 0, np.zeros(n_chan, bool)
+        while got < buf_len:                        # everything waiting
+            block, _ = pull(timeout=0.0)
+            if len(block) == 0:
                 break
-            if start_t is None:
-                start_t = ts
-            t_rel = ts - start_t
-            times.append(t_rel)
-            for ch, val in enumerate(sample):
-                buffers[ch].append(val)
-            new_pts += 1
-
-        if new_pts == 0:
+            ring.extend(block)
+            changed |= ranges.grow(block)
+            got += len(block)
+        if got == 0:
             return lines
 
-        t = np.asarray(times)
-        right = t[-1]
-        left  = right - window_s if right > window_s else 0
+        blank = (np.arange(ring.idx, ring.idx + gap)) % buf_len
+        ring.data[:, blank] = np.nan
+
+        if tick() % max(1, int(window_s * fps)) == 0:   # once per sweep
+            changed |= ranges.shrink(ring.data)
 
-        for ch, (ax, line) in enumerate(zip(axes, lines)):
-            line.set_data(t, np.asarray(buffers[ch]))
-            ax.set_xlim(left, right)
-            ax.relim(); ax.autoscale_view(scalex=False, scaley=True)
+        for line, row in zip(lines, ring.data):
+            line.set_ydata(row)
+        pending |= changed
+        now = time.perf_counter()
+        if pending.any() and now - last_rescale >= YLIM_EVERY:
+            redraw(np.flatnonzero(pending))         # only the axes that rescaled
+            pending[:], last_rescale = False, now
         return lines
 
+    return fig, update
+
+# ───────────────────────── waterfall ────────────────────────────────────────
+class ColumnRing:
+    """Rolling (rows × cols) image stored twice side by side, so the last
+    `cols` columns, oldest first, are always one contiguous view: adding a
+    column is two writes, never a shift of the whole history."""
+
+    def __init__(self, n_rows: int, n_cols: int):
+        self.n = n_cols
+        self.buf = np.full((n_rows, 2 * n_cols), np.nan, np.float32)
+        self.idx = 0                                # next column to write
+
+    def extend(self, cols: np.ndarray):
+        """Append a (columns × rows) block."""
+        cols = cols[-self.n:]
+        pos = (self.idx + np.arange(len(cols))) % self.n
+        self.buf[:, pos] = cols.T
+        self.buf[:, pos + self.n] = cols.T
+        self.idx = (self.idx + len(cols)) % self.n
+
+    def view(self) -> np.ndarray:
+        return self.buf[:, self.idx:self.idx + self.n]
+
+def build_waterfall(window_s: float = 10.0, fps: float = 25, source=None,
+                    db: bool = False, n_cols: int = WATERFALL_COLS):
+    """Like build_viewer, as a scrolling image: rows are channels (FFT bins),
+    each column the mean of the samples it spans; `db` shows 20·log10|x|."""
+    pull, n_chan, srate = open_source(window_s, source)
+    per_col = max(1, int(np.ceil(window_s * srate / n_cols)))
+    n_cols  = max(1, int(window_s * srate) // per_col)
+    ring    = ColumnRing(n_chan, n_cols)
+    carry   = np.zeros((0, n_chan), np.float32)    # samples short of a column
+
+    fig, ax = plt.subplots(figsize=(10, 5), constrained_layout=True)
+    im = ax.imshow(ring.view(), aspect="auto", origin="lower", cmap="magma",
+                   interpolation="nearest", vmin=0, vmax=1,
+                   extent=(-window_s, 0, -0.5, n_chan - 0.5))
+    cbar = fig.colorbar(im, ax=ax, label="dB" if db else "value")
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Bin (Hz)" if n_chan > 16 else "Channel")
+    tick = frame_monitor(fps)
+    last_rescale = -np.inf
+
+    def rescale() -> bool:
+        """Colour limits from the window's 2nd–98th percentile; True if moved."""
+        with np.errstate(all="ignore"):
+            lo, hi = np.nanpercentile(ring.view(), (2, 98))
+        if not np.isfinite(lo):
+            return False
+        hi = max(hi, lo + 1e-6)
+        vlo, vhi = im.get_clim()
+        if abs(lo - vlo) + abs(hi - vhi) < 0.2 * (vhi - vlo):
+            return False
+        im.set_clim(lo, hi)
+        return True
+
+    def update(_):
+        nonlocal carry, last_rescale
+        parts, got = [carry], 0
+        while got < n_cols * per_col:               # everything waiting
+            block, _ = pull(timeout=0.0)
+            if len(block) == 0:
+                break
+            parts.append(np.asarray(block, np.float32))
+            got += len(block)
+        if got == 0:
+            return [im]
+        data = np.concatenate(parts)
+        m = len(data) // per_col
+        carry = data[m * per_col:]
+        if m:
+            cols = data[:m * per_col].reshape(m, per_col, n_chan).mean(axis=1)
+            if db:
+                cols = 20 * np.log10(np.abs(cols) + 1e-6)
+            ring.extend(cols)
+            im.set_data(ring.view())
+        tick()
+        now = time.perf_counter()
+        if now - last_rescale >= RESCALE_EVERY:     # wall clock, so any fps works
+            last_rescale = now
+            if rescale():
+                fig.canvas.draw()                   # colour bar needs a full redraw
+        return [im]
+
+    return fig, update
+
+VIEWERS = {"lines": build_viewer, "waterfall": build_waterfall}
+
+def start_live_viewer(window_s: float | None = None, fps: float = 25, source=None,
+                      mode: str = "lines", **kw):
+    """Plot the EEG stream live (see build_viewer for `source`); `mode` is
+    "lines" (default window 1 s) or "waterfall" (10 s)."""
+    if window_s is None:
+        window_s = 10.0 if mode == "waterfall" else 1.0
+    fig, update = VIEWERS[mode](window_s, fps, source, **kw)
+    print("[INFO] Opening EEG live viewer window…")
+
     # Keep a reference so the animation isn't garbage-collected
-    anim = FuncAnimation(fig, update, interval=40, blit=False)
+    anim = FuncAnimation(fig, update, interval=1000 / fps, blit=True,
+                         cache_frame_data=False)
 
     plt.show()
 
+def run_viewer_process(spec: dict, window_s: float | None = None, fps: float = 25,
+                       mode: str = "lines"):
+    """multiprocessing target: view an Acquisition's shared-memory ring, so
+    rendering never competes with capture for the recording process's GIL."""
+    start_live_viewer(window_s, fps, source=RingSource(spec), mode=mode)
+
+# ───────────────────────── offline review ───────────────────────────────────
+class MinMaxPyramid:
+    """Per-channel min/max of a (samples × channels) recording over blocks of
+    base, base·factor, base·factor², … samples, built in one chunked pass.
+    An envelope of any span then costs about one summary row per column."""
+
+    def __init__(self, rows, n: int, base: int = REVIEW_BASE, factor: int = 8,
+                 chunk: int = 1 << 18):
+        self.rows, self.n, self.base = rows, n, base
+        lo, hi = [], []
+        step = chunk - chunk % base                 # blocks never straddle reads
+        for a in range(0, n, step):
+            x = np.asarray(rows(a, min(a + step, n)), np.float32)
+            idx = np.arange(0, len(x), base)
+            lo.append(np.minimum.reduceat(x, idx, axis=0))
+            hi.append(np.maximum.reduceat(x, idx, axis=0))
+        self.levels = [(base, np.concatenate(lo), np.concatenate(hi))]
+        while len(self.levels[-1][1]) > factor:
+            size, l, h = self.levels[-1]
+            idx = np.arange(0, len(l), factor)
+            self.levels.append((size * factor, np.minimum.reduceat(l, idx, axis=0),
+                                np.maximum.reduceat(h, idx, axis=0)))
+
+    @classmethod
+    def cached(cls, path: str, rows, n: int, base: int = REVIEW_BASE,
+               factor: int = 8) -> tuple["MinMaxPyramid", bool]:
+        """(pyramid, reused) for recording `path`: loaded from its summary
+        sidecar if that matches the file's size and mtime, else built and
+        saved there (a read-only folder only costs the rebuild next time)."""
+        st   = os.stat(path)
+        meta = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "n": n,
+                "base": base, "factor": factor}
+        side = summary_path(path)
+        try:
+            with np.load(side) as z:
+                if json.loads(str(z["meta"])) == meta:
+                    pyr = cls.__new__(cls)
+                    pyr.rows, pyr.n, pyr.base = rows, n, base
+                    pyr.levels = [(int(size), z[f"lo{i}"], z[f"hi{i}"])
+                                  for i, size in enumerate(z["sizes"])]
+                    return pyr, True
+        except (OSError, KeyError, ValueError):
+            pass
+        pyr = cls(rows, n, base, factor)
+        arrays = {f"{k}{i}": v for i, (_, lo, hi) in enumerate(pyr.levels)
+                  for k, v in (("lo", lo), ("hi", hi))}
+        tmp = side + ".tmp.npz"
+        try:
+            np.savez(tmp, meta=json.dumps(meta),
+                     sizes=[size for size, _, _ in pyr.levels], **arrays)
+            os.replace(tmp, side)                   # never leave a torn summary
+        except OSError as e:
+            print(f"[WARN] summary not cached: {e}", file=sys.stderr)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return pyr, False
+
+    def envelope(self, a: int, b: int, width: int):
+        """(x, lo, hi) for rows [a, b) drawn `width` columns wide; raw samples
+        (lo is hi) when there are no more of them than 2 per column."""
+        if b - a <= 2 * width:
+            x = np.asarray(self.rows(a, b), np.float32)
+            return np.arange(a, b), x, x
+        edges = a + (b - a) * np.arange(width + 1) // width
+        spp   = (b - a) / width
+        fits  = [lv for lv in self.levels if lv[0] <= spp]
+        if not fits:                                # zoomed in: reduce raw rows
+            x = np.asarray(self.rows(a, b), np.float32)
+            idx = edges[:-1] - a
+            return (edges[:-1], np.minimum.reduceat(x, idx, axis=0),
+                    np.maximum.reduceat(x, idx, axis=0))
+        size, lo, hi = fits[-1]
+        first = np.minimum(edges[:-1] // size, len(lo) - 1)
+        last  = np.minimum((edges[1:] - 1) // size, len(lo) - 1)  # partly covered
+        lo, hi = lo[:last[-1] + 1], hi[:last[-1] + 1]   # reduceat runs its last column
+        return (edges[:-1],                             # to the end of what it is given
+                np.minimum(np.minimum.reduceat(lo, first, axis=0), lo[last]),
+                np.maximum(np.maximum.reduceat(hi, first, axis=0), hi[last]))
+
+class Review:
+    """Scrub, zoom and play back one saved recording (channels stacked)."""
+
+    def __init__(self, path: str, span_s: float = 10.0, fps: float = 25,
+                 srate: float | None = None):
+        if path.endswith(".eegz"):
+            self._reader = EegzReader(path)
+            rows, n = self._reader.read, len(self._reader)
+        else:
+            data = np.load(path, mmap_mode="r")
+            rows, n = (lambda a, b: data[a:b]), len(data)
+        if n == 0:
+            raise ValueError(f"{path} holds no samples")
+        try:                                        # real rate from the timestamps
+            ts = np.load(timestamps_path(path), mmap_mode="r")
+            srate = srate or (len(ts) - 1) / float(ts[-1] - ts[0])
+        except (OSError, ValueError, ZeroDivisionError):
+            pass
+        self.srate = srate or 256.0
+        self.n, self.fps = n, fps
+        t0 = time.perf_counter()
+        self.pyr, reused = MinMaxPyramid.cached(path, rows, n)
+        _, lo, hi = self.pyr.levels[-1]
+        lo, hi = lo.min(axis=0), hi.max(axis=0)
+        self.n_chan = len(lo)
+        self.mid   = (lo + hi) / 2
+        self.scale = np.where(hi > lo, hi - lo, 1.0) / 0.9
+        print(f"[INFO] {path}: {n} samples × {self.n_chan} ch, "
+              f"{n / self.srate / 60:.1f} min, summary "
+              f"{'loaded' if reused else 'built'} in {time.perf_counter() - t0:.2f} s")
+
+        self.span  = int(min(max(span_s * self.srate, 16), n))
+        self.pos   = 0
+        self.speed = REVIEW_SPEEDS[0]
+        self.playing, self._last = False, 0.0
+
+        self.fig = plt.figure(figsize=(12, 7))
+        self.ax  = self.fig.add_axes((0.06, 0.14, 0.92, 0.80))
+        offsets  = self.n_chan - 1 - np.arange(self.n_chan)     # channel 0 on top
+        # zoomed out: one filled min/max band per channel (a polygon fills far
+        # faster than a zigzag line strokes); zoomed in: plain lines
+        self.bands = PolyCollection([], linewidths=0, facecolors="C0")
+        self.ax.add_collection(self.bands)
+        self.lines = [self.ax.plot([], [], lw=0.7, color="C0")[0] for _ in offsets]
+        self.offsets = offsets
+        every = max(1, self.n_chan // 16)
+        self.ax.set_yticks(offsets[::every], [f"Ch {c + 1}" for c in
+                                              range(0, self.n_chan, every)])
+        self.ax.set_ylim(-1, self.n_chan)
+        self.ax.set_xlabel("Time (s)")
+        for offset, _, label in read_markers(path):
+            if label != END:
+                self.ax.axvline(offset / self.srate, color="C3", lw=0.8)
+                self.ax.text(offset / self.srate, self.n_chan - 0.5, label,
+                             color="C3", fontsize=8, va="top")
+        sax = self.fig.add_axes((0.06, 0.03, 0.80, 0.03))
+        self.slider = Slider(sax, "", 0, max(n - self.span, 1) / self.srate,
+                             valinit=0)
+        self.slider.valtext.set_visible(False)
+        self.slider.on_changed(self._on_slider)
+        self.status = self.fig.text(0.87, 0.035, "", fontsize=9)
+        self.fig.canvas.mpl_connect("scroll_event", self._on_scroll)
+        self.fig.canvas.mpl_connect("key_press_event", self._on_key)
+        self.timer = self.fig.canvas.new_timer(interval=int(1000 / fps))
+        self.timer.add_callback(self._on_timer)
+        self.redraw()
+
+    # ── view ────────────────────────────────────────────────────────────────
+    def width(self) -> int:
+        """Pixel columns of the plot area."""
+        return max(16, int(self.ax.get_window_extent().width))
+
+    def redraw(self):
+        a, b = self.pos, min(self.pos + self.span, self.n)
+        x, lo, hi = self.pyr.envelope(a, b, self.width())
+        raw = lo is hi
+        x, lo, hi = (x / self.srate, (lo - self.mid) / self.scale + self.offsets,
+                     (hi - self.mid) / self.scale + self.offsets)
+        if raw:
+            for line, col in zip(self.lines, lo.T):
+                line.set_data(x, col)
+            self.bands.set_verts([])
+        else:
+            xx = np.r_[x, x[::-1]]
+            self.bands.set_verts([np.column_stack([xx, np.r_[l, h[::-1]]])
+                                  for l, h in zip(lo.T, hi.T)])
+            for line in self.lines:
+                line.set_data([], [])
+        self.ax.set_xlim(a / self.srate, (a + self.span) / self.srate)
+        self.status.set_text(f"{'▶' if self.playing else '❚❚'} {self.speed}×  "
+                             f"{self.span / self.srate:.1f} s")
+        self.fig.canvas.draw_idle()
+
+    def seek(self, pos: int, from_slider: bool = False):
+        self.pos = int(np.clip(pos, 0, max(self.n - self.span, 0)))
+        if not from_slider:
+            self.slider.eventson = False            # no feedback through _on_slider
+            self.slider.set_val(self.pos / self.srate)
+            self.slider.eventson = True
+        self.redraw()
+
+    def zoom(self, factor: float, about: float | None = None):
+        """Scale the span by `factor` around sample `about` (default centre)."""
+        about = self.pos + self.span / 2 if about is None else about
+        frac  = (about - self.pos) / self.span
+        self.span = int(np.clip(self.span * factor, 16, self.n))
+        self.slider.valmax = max(self.n - self.span, 1) / self.srate
+        self.slider.ax.set_xlim(0, self.slider.valmax)
+        self.seek(about - frac * self.span)
+
+    def play(self, on: bool | None = None):
+        self.playing = not self.playing if on is None else on
+        self._last = time.perf_counter()
+        (self.timer.start if self.playing else self.timer.stop)()
+        self.redraw()
+
+    # ── events ──────────────────────────────────────────────────────────────
+    def _on_slider(self, val):
+        self.seek(round(val * self.srate), from_slider=True)
+
+    def _on_scroll(self, event):
+        about = event.xdata * self.srate if event.inaxes is self.ax else None
+        self.zoom(0.8 if event.button == "up" else 1.25, about)
+
+    def _on_key(self, event):
+        k = event.key
+        if k == " ":
+            self.play()
+        elif k in ("+", "=", "up", "-", "down"):
+            i = REVIEW_SPEEDS.index(self.speed) + (1 if k in ("+", "=", "up") else -1)
+            self.speed = REVIEW_SPEEDS[int(np.clip(i, 0, len(REVIEW_SPEEDS) - 1))]
+            self.redraw()
+        elif k in ("left", "right"):
+            self.seek(self.pos + (self.span // 2) * (1 if k == "right" else -1))
+        elif k in ("home", "end"):
+            self.seek(0 if k == "home" else self.n)
+
+    def _on_timer(self):
+        now = time.perf_counter()                   # real time, however slow a frame
+        step = (now - self._last) * self.srate * self.speed
+        self._last = now
+        if self.pos + self.span >= self.n:
+            self.play(False)
+            return
+        self.seek(self.pos + round(step))
+
+def start_review(path: str, span_s: float = 10.0, fps: float = 25,
+                 speed: int = 1, srate: float | None = None):
+    """Open the review window for one recording."""
+    rv = Review(path, span_s, fps, srate)
+    rv.speed = speed
+    rv.redraw()
+    plt.show()
+
 # ───────────────────────── CLI entry-point ──────────────────────────────────
 if __name__ == "__main__":
-    start_live_viewer()
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--waterfall", action="store_true",
+                    help="scrolling image instead of one line per channel")
+    ap.add_argument("--window", type=float, help="seconds shown (1 lines, 10 waterfall)")
+    ap.add_argument("--fps", type=float, default=25)
+    ap.add_argument("--db", action="store_true", help="waterfall in 20·log10|x|")
+    ap.add_argument("--review", metavar="PATH", help="browse a saved recording")
+    ap.add_argument("--speed", type=int, default=1, choices=REVIEW_SPEEDS,
+                    help="review playback speed")
+    ap.add_argument("--srate", type=float, help="review rate if there is no .ts.npy")
+    args = ap.parse_args()
+
+    if args.review:
+        start_review(args.review, args.window or 10.0, args.fps, args.speed,
+                     args.srate)
+    elif args.waterfall:
+        start_live_viewer(args.window, args.fps, mode="waterfall", db=args.db)
+    else:
+        start_live_viewer(args.window, args.fps)
@@ -0,0 +1,257 @@
+"""
+eeg_writer.py – append-only .npy writer for long EEG recordings.
+
+Samples are copied into a preallocated block and flushed to disk every
+`block_rows` samples, so memory stays flat however long a session runs.
+The .npy header has a fixed size and is rewritten after every flush, which
+keeps the file loadable (np.load / mmap_mode="r") up to the last block.
+
+A `Checkpointer` moves the block writes of one recording to its own thread
+and fsyncs them every few seconds, recording the durable row counts in a
+small x.ckpt.json header; eeg_recover.py uses it after a crash.
+"""
+import json, os, queue, threading, time
+import numpy as np
+
+HEADER_LEN = 128        # fixed-size v1.0 header, rewritten in place on flush
+CHECKPOINT_EVERY = 2.0  # s between fsyncs of a checkpointed recording
+_MAGIC     = b"\x93NUMPY\x01\x00"
+
+# ───────────────────────── helpers ──────────────────────────────────────────
+def npy_header(shape, dtype) -> bytes:
+    """Return a HEADER_LEN-byte .npy v1.0 header for a C-ordered array."""
+    descr = np.lib.format.dtype_to_descr(np.dtype(dtype))
+    text  = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" \
+            % (descr, tuple(int(n) for n in shape))
+    room  = HEADER_LEN - len(_MAGIC) - 2
+    if len(text) + 1 > room:
+        raise ValueError(f"npy header too long for shape {shape}")
+    text  = text.ljust(room - 1) + "\n"
+    return _MAGIC + room.to_bytes(2, "little") + text.encode("latin1")
+
+def timestamps_path(path: str) -> str:
+    """Sidecar holding per-sample LSL timestamps: x.npy → x.ts.npy."""
+    return os.path.splitext(path)[0] + ".ts.npy"
+
+def markers_path(path: str) -> str:
+    """Sidecar holding in-session event markers: x.npy → x.markers.tsv."""
+    return os.path.splitext(path)[0] + ".markers.tsv"
+
+def summary_path(path: str) -> str:
+    """Cached min/max review summary of a recording: x.npy → x.minmax.npz."""
+    return os.path.splitext(path)[0] + ".minmax.npz"
+
+def checkpoint_path(path: str) -> str:
+    """Checkpoint header of a recording in progress: x.npy → x.ckpt.json."""
+    return os.path.splitext(path)[0] + ".ckpt.json"
+
+def is_sidecar(path: str) -> bool:
+    """True for companion files that are not recordings themselves."""
+    return path.endswith(".ts.npy")
+
+# ───────────────────────── writers ──────────────────────────────────────────
+class BlockWriter:
+    """Buffer rows of `n_cols` values in a preallocated block and hand each
+    full block to `_write_block`; subclasses decide what goes on disk.
+
+    With `n_cols=None` the output is a 1-D array (e.g. timestamps).
+    """
+
+    def __init__(self, path: str, n_cols: int | None, dtype=np.float32,
+                 block_rows: int = 1024):
+        self.path, self.vector = path, n_cols is None
+        self.n_cols = 1 if self.vector else n_cols
+        self.dtype  = np.dtype(dtype)
+        self.n_rows = 0                              # rows handed to flush()
+        self.disk_rows = 0                           # rows written to the file
+        self._block = np.zeros((block_rows, self.n_cols), self.dtype)
+        self._fill  = 0
+        self.flusher: "Checkpointer | None" = None   # does the I/O if set
+        self.flush_soon = False                      # flusher wants a partial block
+        self._free  = queue.SimpleQueue()            # blocks it has written
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "wb+")
+
+    def _shape(self, n_rows: int) -> tuple:
+        return (n_rows,) if self.vector else (n_rows, self.n_cols)
+
+    def __len__(self):
+        return self.n_rows + self._fill
+
+    @property
+    def bytes_written(self) -> int:
+        """Current size of the file on disk."""
+        return os.fstat(self._f.fileno()).st_size if not self._f.closed else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── writing ─────────────────────────────────────────────────────────────
+    def append(self, rows):
+        """Append one sample (1-D) or a block of samples (2-D).
+
+        Rows wider than `n_cols` are truncated, narrower ones zero-padded.
+        """
+        rows = np.asarray(rows)
+        if self.vector:
+            rows = rows.reshape(-1, 1)
+        elif rows.ndim == 1:
+            rows = rows[None]
+        w = min(rows.shape[1], self.n_cols)
+
+        i, n = 0, len(rows)
+        while i < n:
+            k = min(n - i, len(self._block) - self._fill)
+            dst = self._block[self._fill:self._fill + k]
+            dst[:, :w] = rows[i:i + k, :w]
+            if w < self.n_cols:
+                dst[:, w:] = 0
+            self._fill += k
+            i += k
+            if self._fill == len(self._block):
+                self.flush()
+        if self.flush_soon:                         # checkpoint is due
+            self.flush_soon = False
+            self.flush()
+
+    def flush(self):
+        """Write the pending block, or hand it to the flusher thread."""
+        if self._fill == 0:
+            return
+        if self.flusher is None:
+            self._commit(self._block, self._fill)
+        else:
+            self.flusher.submit(self, self._block, self._fill)
+            try:                                    # reuse a written block
+                self._block = self._free.get_nowait()
+            except queue.Empty:
+                self._block = np.zeros_like(self._block)
+        self.n_rows += self._fill
+        self._fill = 0
+
+    def _commit(self, block: np.ndarray, n: int):
+        """Write block[:n] to the file (caller's thread or the flusher's)."""
+        self._write_block(block[:n])
+        self.disk_rows += n
+        self._f.flush()
+
+    def _write_block(self, rows: np.ndarray):
+        raise NotImplementedError
+
+    def _finish(self):
+        """Called once after the last flush, before the file is closed."""
+
+    def close(self, fsync: bool = False) -> int:
+        """Flush what is left, close the file and return the row count."""
+        if not self._f.closed:
+            if self.flusher is not None:
+                raise RuntimeError("close the Checkpointer, not its writers")
+            self.flush()
+            self._finish()
+            if fsync:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+            self._f.close()
+        return self.n_rows
+
+class NpyStreamWriter(BlockWriter):
+    """Append-only .npy file whose header is kept current after every block."""
+
+    def __init__(self, path: str, n_cols: int | None, dtype=np.float32,
+                 block_rows: int = 1024):
+        super().__init__(path, n_cols, dtype, block_rows)
+        self._f.write(npy_header(self._shape(0), self.dtype))
+
+    def _write_block(self, rows: np.ndarray):
+        self._f.seek(0, os.SEEK_END)
+        self._f.write(rows.tobytes())
+        self._f.seek(0)
+        self._f.write(npy_header(self._shape(self.disk_rows + len(rows)), self.dtype))
+
+# ───────────────────────── checkpointing ────────────────────────────────────
+class Checkpointer(threading.Thread):
+    """Write the blocks of a recording's writers on a thread of their own.
+
+    Every `every` seconds the files are fsync'd and the durable row count of
+    each is stored in `header` (written atomically), so after a crash the
+    recording can be rebuilt up to the last checkpoint or further.  The
+    writers' flush() only queues the block, so the capture loop never waits
+    for the disk; after each checkpoint they also flush a partial block, so
+    at most about 2 × `every` seconds are lost whatever `block_rows` is.
+    """
+
+    def __init__(self, header: str, writers, every: float = CHECKPOINT_EVERY,
+                 meta: dict | None = None):
+        super().__init__(daemon=True)
+        self.header, self.every, self.meta = header, every, meta or {}
+        self.writers = list(writers)
+        self.q = queue.Queue()
+        self.checkpoints = 0
+        self.error: Exception | None = None
+        for w in self.writers:
+            w.flusher = self
+        self._write_header()
+
+    @property
+    def backlog(self) -> int:
+        """Blocks queued but not yet written."""
+        return self.q.qsize()
+
+    def submit(self, writer: BlockWriter, block: np.ndarray, n: int):
+        self.q.put((writer, block, n))
+
+    def run(self):
+        due = time.monotonic() + self.every
+        while True:
+            try:
+                item = self.q.get(timeout=max(0.0, due - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                writer, block, n = item
+                try:
+                    writer._commit(block, n)
+                except OSError as e:                # disk full, etc.: keep going
+                    self.error = e
+                writer._free.put(block)
+            if time.monotonic() >= due:
+                self.checkpoint()
+                for w in self.writers:              # partial blocks make the next one
+                    w.flush_soon = True
+                due = time.monotonic() + self.every
+
+    def checkpoint(self):
+        """fsync every file, then record how many rows each durably holds."""
+        try:
+            for w in self.writers:
+                os.fsync(w._f.fileno())
+            self._write_header()
+            self.checkpoints += 1
+        except OSError as e:
+            self.error = e
+
+    def _write_header(self):
+        state = {**self.meta, "time": time.time(),
+                 "rows": {os.path.basename(w.path): w.disk_rows for w in self.writers}}
+        tmp = self.header + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.header)
+
+    def close(self):
+        """Write what is queued, close every writer durably and remove the
+        header: the recording is complete."""
+        self.q.put(None)
+        self.join()
+        for w in self.writers:
+            w.flusher = None
+            w.close(fsync=True)
+        os.remove(self.header)
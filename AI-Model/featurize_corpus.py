@@ -0,0 +1,163 @@
+"""
+featurize_corpus.py – compute eeg_features over every recording, in parallel.
+Run:  python featurize_corpus.py data --workers 8 [--window 256 --hop 32]
+
+Each recording's features land in <cache>/<category>/<name>.<cfg>.npz, where
+<cfg> hashes the feature config.  The .npz also records a hash of the source
+file; a cache entry is reused when both still match, so re-running after a
+few new recordings only processes those.  Source hashes are remembered with
+the file's mtime and size, so unchanged files are not re-read to check them;
+a touched file is hashed in a worker, and if its content is the same only the
+remembered mtime and size are updated.  The sample rate is each recording's
+own, from the catalog's sidecar-derived duration, unless --srate fixes it.
+"""
+import argparse, hashlib, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from eeg_catalog import Catalog
+from eeg_dataset import open_recording
+from eeg_features import StreamingFeatures, FeatureBlock, BANDS
+from eeg_writer import timestamps_path
+
+HASH_BLOCK = 1 << 20
+FALLBACK_SRATE = 256.0  # Hz, for recordings without a .ts.npy sidecar
+
+# ───────────────────────── keys ─────────────────────────────────────────────
+def config_key(config: dict) -> str:
+    blob = json.dumps(config, sort_keys=True).encode()
+    return hashlib.blake2b(blob, digest_size=6).hexdigest()
+
+def file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_BLOCK):
+            h.update(chunk)
+    return h.hexdigest()
+
+def cache_path(cache: str, rel: str, cfg_key: str) -> str:
+    stem = os.path.splitext(rel)[0]
+    return os.path.join(cache, f"{stem}.{cfg_key}.npz")
+
+def _cached_meta(path: str) -> dict | None:
+    try:
+        with np.load(path) as z:
+            return json.loads(str(z["meta"]))
+    except (OSError, KeyError, ValueError):
+        return None
+
+def load_features(path: str) -> FeatureBlock:
+    with np.load(path) as z:
+        return FeatureBlock(*(z[name] for name in FeatureBlock._fields))
+
+def _save(dst: str, meta: dict, arrays: dict):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = dst + ".tmp.npz"
+    np.savez(tmp, meta=json.dumps(meta), **arrays)
+    os.replace(tmp, dst)                            # never leave a torn cache entry
+
+def entry_srate(e: dict) -> float:
+    """A catalog entry's sample rate, from its timestamps' span."""
+    if e["duration_s"] and e["n_samples"] > 1:
+        return round((e["n_samples"] - 1) / e["duration_s"], 2)
+    return FALLBACK_SRATE
+
+# ───────────────────────── worker ───────────────────────────────────────────
+def featurize_file(src: str, dst: str, config: dict, meta: dict) -> tuple[str, int]:
+    """Run in a worker process: features of one recording → dst (.npz)."""
+    data  = open_recording(src)
+    tpath = timestamps_path(src)
+    ts    = np.load(tpath, mmap_mode="r") if os.path.exists(tpath) else None
+    fx    = StreamingFeatures(data.shape[1], meta["srate"], config["window"],
+                              config["hop"], config["bands"])
+    parts, step = [], 64 * config["window"]
+    for i in range(0, len(data), step):
+        res = fx.push(data[i:i + step], None if ts is None else ts[i:i + step])
+        if res is not None:
+            parts.append(res)
+    if parts:
+        fb = FeatureBlock(*(np.concatenate(p) for p in zip(*parts)))
+    else:
+        c, b = data.shape[1], len(config["bands"])
+        fb = FeatureBlock(np.zeros(0), np.zeros((0, c)), np.zeros((0, c)),
+                          np.zeros((0, c, b)), np.zeros((0, c)))
+
+    _save(dst, meta, fb._asdict())
+    return dst, len(fb)
+
+def refresh_file(src: str, dst: str, config: dict, meta: dict,
+                 old: dict | None) -> tuple[str, int, bool]:
+    """Run in a worker process: hash src; if the cache entry was built from
+    the same content only its mtime/size are updated, else recompute.
+    Returns (dst, windows, recomputed)."""
+    meta = {**meta, "source_hash": file_hash(src)}
+    if old and all(old.get(k) == meta[k] for k in ("source_hash", "config_key", "srate")):
+        with np.load(dst) as z:                     # touched, same content
+            arrays = {k: z[k] for k in FeatureBlock._fields}
+        _save(dst, meta, arrays)
+        return dst, len(arrays["t"]), False
+    return (*featurize_file(src, dst, config, meta), True)
+
+# ───────────────────────── planning ─────────────────────────────────────────
+def plan(root: str, cache: str, config: dict, force: bool = False):
+    """Split the catalog into (jobs to check in a worker, valid cache paths);
+    hashing is left to the workers, so planning only stats."""
+    cfg_key = config_key(config)
+    jobs, fresh = [], []
+    with Catalog(root) as cat:
+        cat.update()
+        entries = cat.entries()
+    for e in entries:
+        src = os.path.join(root, e["path"])
+        dst = cache_path(cache, e["path"], cfg_key)
+        srate = config["srate"] or entry_srate(e)
+        old = None if force else _cached_meta(dst)
+        if old and (old["mtime_ns"], old["size"], old.get("srate")) == \
+                (e["mtime_ns"], e["size"], srate):
+            fresh.append(dst)                       # untouched since we hashed it
+            continue
+        meta = {"source": e["path"], "mtime_ns": e["mtime_ns"], "size": e["size"],
+                "srate": srate, "config": config, "config_key": cfg_key}
+        jobs.append((src, dst, meta, old))
+    return jobs, fresh
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("root", nargs="?", default="data")
+    ap.add_argument("--cache", help="feature cache folder (default: features/ "
+                                    "next to the data root)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--srate", type=float,
+                    help=f"Hz for every file (default: each recording's own, "
+                         f"{FALLBACK_SRATE:g} without timestamps)")
+    ap.add_argument("--window", type=int, default=256)
+    ap.add_argument("--hop", type=int, default=32)
+    ap.add_argument("--force", action="store_true", help="ignore the cache")
+    args = ap.parse_args()
+
+    cache  = args.cache or os.path.join(os.path.dirname(os.path.normpath(args.root)),
+                                        "features")
+    config = {"srate": args.srate, "window": args.window, "hop": args.hop,
+              "bands": BANDS}
+    t0 = time.perf_counter()
+    jobs, fresh = plan(args.root, cache, config, args.force)
+    print(f"[INFO] {len(fresh)} cached, {len(jobs)} to check "
+          f"(config {config_key(config)}, planned in "
+          f"{time.perf_counter() - t0:.2f} s)")
+
+    failed = computed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futs = {pool.submit(refresh_file, src, dst, config, meta, old): src
+                for src, dst, meta, old in jobs}
+        for i, fut in enumerate(as_completed(futs), 1):
+            try:
+                dst, n, recomputed = fut.result()
+                computed += recomputed
+                print(f"[{i}/{len(jobs)}] {futs[fut]} → {n} windows"
+                      f"{'' if recomputed else ' (same content, kept)'}")
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] {futs[fut]}: {e}", file=sys.stderr)
+    print(f"[DONE] {computed} computed, {len(jobs) - computed - failed} kept, "
+          f"{failed} failed in "
+          f"{time.perf_counter() - t0:.2f} s → {cache}")
@@ -0,0 +1,109 @@
+"""
+model_registry.py – trained models filed under a hash of everything that made them.
+Run:  python model_registry.py [models]          # list what is cached
+
+A spec is a JSON-able dict: dataset, architecture, training settings and a
+hash of the source code that generates the data and builds the model.  Its
+key is the SHA-256 of the canonical JSON, and the model lives in
+<root>/<key[:16]>/ beside spec.json, so a changed spec can never load a stale
+model.  Specs differing only in `train.epochs` share a "family": the entry
+with the most epochs below a request is the warm start for it.
+"""
+import argparse, hashlib, inspect, json, os, shutil, sys, time
+
+EPOCHS = ("train", "epochs")    # the spec field a warm start may extend
+
+# ───────────────────────── hashing ──────────────────────────────────────────
+def spec_key(spec: dict) -> str:
+    """SHA-256 of the spec's canonical JSON."""
+    blob = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+def source_hash(*objs) -> str:
+    """Short hash of the source of functions/classes, so edits change keys."""
+    h = hashlib.sha256()
+    for obj in objs:
+        h.update(inspect.getsource(obj).encode())
+    return h.hexdigest()[:16]
+
+def family_key(spec: dict) -> str:
+    """spec_key with the epoch count left out."""
+    outer, inner = EPOCHS
+    return spec_key({**spec, outer: {k: v for k, v in spec.get(outer, {}).items()
+                                      if k != inner}})
+
+def _epochs(spec: dict) -> int:
+    outer, inner = EPOCHS
+    return int(spec.get(outer, {}).get(inner, 0))
+
+# ───────────────────────── registry ─────────────────────────────────────────
+class ModelRegistry:
+    """Directory of <key>/spec.json + model files, written atomically."""
+
+    MODEL = "model.keras"
+
+    def __init__(self, root: str = "models"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, spec: dict) -> str:
+        return os.path.join(self.root, spec_key(spec)[:16])
+
+    def entries(self) -> list[dict]:
+        """spec.json of every complete entry, oldest first."""
+        out = []
+        for name in sorted(os.listdir(self.root)):
+            try:
+                with open(os.path.join(self.root, name, "spec.json")) as f:
+                    out.append({**json.load(f), "dir": os.path.join(self.root, name)})
+            except (OSError, ValueError):
+                continue                            # partial write or foreign dir
+        return sorted(out, key=lambda e: e.get("created", 0))
+
+    def get(self, spec: dict) -> dict | None:
+        """The entry trained from exactly this spec, or None."""
+        d = self.path(spec)
+        try:
+            with open(os.path.join(d, "spec.json")) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return {**entry, "dir": d} if entry["key"] == spec_key(spec) else None
+
+    def closest(self, spec: dict) -> dict | None:
+        """Entry of the same family with the most epochs below the spec's."""
+        fam, want = family_key(spec), _epochs(spec)
+        best = [e for e in self.entries()
+                if e["family"] == fam and _epochs(e["spec"]) < want]
+        return max(best, key=lambda e: _epochs(e["spec"]), default=None)
+
+    def put(self, spec: dict, save, **meta) -> dict:
+        """File a model: `save(dir)` writes its files into a fresh directory,
+        which then replaces any previous entry for the spec in one rename."""
+        d = self.path(spec)
+        tmp = f"{d}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        save(tmp)
+        entry = {"key": spec_key(spec), "family": family_key(spec), "spec": spec,
+                 "created": time.time(), **meta}
+        with open(os.path.join(tmp, "spec.json"), "w") as f:
+            json.dump(entry, f, indent=1)
+        if os.path.exists(d):
+            shutil.rmtree(d)
+        os.replace(tmp, d)
+        return {**entry, "dir": d}
+
+# ───────────────────────── CLI entry-point ──────────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("root", nargs="?", default="models")
+    args = ap.parse_args()
+
+    if not os.path.isdir(args.root):
+        sys.exit(f"[WARN] no registry at {args.root}")
+    for e in ModelRegistry(args.root).entries():
+        extra = "".join(f", {k} {e[k]:.4g}" for k in ("loss", "train_s") if k in e)
+        print(f"{os.path.basename(e['dir'])}  family {e['family'][:8]}  "
+              f"{_epochs(e['spec'])} epochs{extra}"
+              f"{'  warm from ' + e['warm_from'][:16] if e.get('warm_from') else ''}")
@@ -0,0 +1,73 @@
+"""
+test_calc_infer.py – export_weights + DenseNet against a float64 reference.
+Run:  python -m pytest -q test_calc_infer.py
+
+No TensorFlow: the model is a stand-in with the few layer attributes that
+export_weights reads, and export_weights dispatches on the class name.
+"""
+import numpy as np
+import pytest
+from calc_infer import DenseNet, export_weights
+
+# ───────────────────────── stand-in Keras layers ────────────────────────────
+class InputLayer:
+    name = "input"
+
+class Rescaling:
+    name = "rescaling"
+
+    def __init__(self, scale, offset):
+        self.scale, self.offset = scale, offset
+
+class Dense:
+    def __init__(self, name, kernel, bias, activation):
+        self.name = name
+        self._weights, self._act = [kernel, bias], activation
+
+    def get_config(self):
+        return {"name": self.name, "activation": self._act}
+
+    def get_weights(self):
+        return self._weights
+
+class Model:
+    def __init__(self, layers):
+        self.layers = layers
+
+def stack(rng, sizes=(3, 64, 32, 1), acts=("relu", "relu", "linear")):
+    """[(kernel, bias, activation)] with known random float32 weights."""
+    return [(rng.normal(0, 1 / np.sqrt(n), (n, m)).astype(np.float32),
+             rng.normal(0, 0.1, m).astype(np.float32), act)
+            for n, m, act in zip(sizes[:-1], sizes[1:], acts)]
+
+def reference(x, scale, offset, layers):
+    """The Keras forward pass in float64: Rescaling, then the Dense stack."""
+    x = np.asarray(x, np.float64) * scale + offset
+    for W, b, act in layers:
+        x = x @ W.astype(np.float64) + b
+        if act == "relu":
+            x = np.maximum(x, 0)
+    return x
+
+# ───────────────────────── tests ────────────────────────────────────────────
+def test_rescaling_folded_matches_reference(tmp_path):
+    rng    = np.random.default_rng(0)
+    layers = stack(rng)
+    scale  = np.array([1 / 100, 1 / 100, 1 / 3], np.float32)   # raw (a, b, op)
+    offset = np.array([-0.5, -0.5, 0.0], np.float32)
+    model  = Model([InputLayer(), Rescaling(scale, offset)] +
+                   [Dense(f"dense_{i}", W, b, act) for i, (W, b, act) in enumerate(layers)])
+
+    net = DenseNet.load(export_weights(model, str(tmp_path / "w.npz")))
+    x   = np.column_stack([rng.integers(0, 100, (256, 2)),
+                           rng.integers(0, 4, 256)]).astype(np.float32)
+    got = net.predict(x)
+    assert got.shape == (256, 1) and got.dtype == np.float32
+    np.testing.assert_allclose(got, reference(x, scale, offset, layers),
+                               rtol=1e-4, atol=1e-5)
+
+def test_rescaling_without_dense_is_rejected(tmp_path):
+    model = Model([Dense("dense", *stack(np.random.default_rng(1))[0]),
+                   Rescaling(2.0, 0.0)])
+    with pytest.raises(ValueError, match="Rescaling"):
+        export_weights(model, str(tmp_path / "w.npz"))